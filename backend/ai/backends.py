@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import math
+import random
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------
+# BACKEND CONFIG
+# -----------------------
+# "gemini" (default) or "fake" for offline load tests and benchmarks
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+
+# Fake backend tuning
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 800))
+# "fixed", "uniform" (±jitter) or "lognormal" (long tail, sigma = log(1 + jitter / median))
+FAKE_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal").lower()
+FAKE_LATENCY_JITTER_MS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", 300))
+# Bounds that keep a large jitter from producing minute-long outliers
+FAKE_LATENCY_MAX_SIGMA = 1.0
+FAKE_LATENCY_MAX_FACTOR = 10  # no call takes longer than this many times the median
+FAKE_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0))
+FAKE_SEED = int(os.getenv("FAKE_LLM_SEED", 42))
+
+
+class LLMBackendError(Exception):
+    """Raised when the upstream model call fails."""
+
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+def _usage_counts(response):
+    # Gemini reports token usage in usage_metadata; missing fields count as 0
+    metadata = getattr(response, "usage_metadata", None)
+    return (
+        getattr(metadata, "prompt_token_count", 0) or 0,
+        getattr(metadata, "candidates_token_count", 0) or 0,
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text
+    return len(text) // 4 + 1
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, model_name: str):
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str):
+        response = await self.model.generate_content_async(prompt)
+        return Completion(response.text, *_usage_counts(response))
+
+    async def stream(self, prompt: str, usage: dict | None = None):
+        """Yield text chunks; usage, if given, is filled with token counts once the stream ends."""
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            # The last chunk carries the usage totals for the whole response
+            if usage is not None and getattr(chunk, "usage_metadata", None):
+                usage["prompt_tokens"], usage["completion_tokens"] = _usage_counts(chunk)
+            # Chunks without parts (e.g. safety metadata only) have no text
+            if not chunk.parts:
+                continue
+            yield chunk.text
+
+
+class FakeBackend:
+    """
+    Deterministic local stand-in for Gemini. Recognises the app's prompts and
+    returns schema-valid plans, quizzes, explanations and resources, with a
+    configurable latency distribution and failure rate. The same prompt always
+    yields the same text; latencies and failures follow a seeded sequence.
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        self.model_name = "fake-llm"
+        self.random = random.Random(FAKE_SEED)
+
+    # ---------- latency / failures ----------
+    def _latency_seconds(self):
+        if FAKE_LATENCY_DISTRIBUTION == "fixed":
+            latency_ms = FAKE_LATENCY_MS
+        elif FAKE_LATENCY_DISTRIBUTION == "uniform":
+            latency_ms = self.random.uniform(
+                FAKE_LATENCY_MS - FAKE_LATENCY_JITTER_MS, FAKE_LATENCY_MS + FAKE_LATENCY_JITTER_MS
+            )
+        else:
+            # Lognormal with the configured median; one sigma above it is roughly median + jitter
+            sigma = min(math.log1p(FAKE_LATENCY_JITTER_MS / max(FAKE_LATENCY_MS, 1)), FAKE_LATENCY_MAX_SIGMA)
+            latency_ms = FAKE_LATENCY_MS * self.random.lognormvariate(0, sigma)
+        return min(max(latency_ms, 0), FAKE_LATENCY_MS * FAKE_LATENCY_MAX_FACTOR) / 1000
+
+    def _maybe_fail(self):
+        if self.random.random() < FAKE_FAILURE_RATE:
+            raise LLMBackendError("Simulated upstream failure")
+
+    # ---------- content ----------
+    @staticmethod
+    def _pick(seed: str, options: list):
+        digest = int(hashlib.sha256(seed.encode("utf-8")).hexdigest(), 16)
+        return options[digest % len(options)]
+
+    def _quiz(self, prompt: str):
+        count_match = re.search(r"(\d+)\s+(?:[\w-]+\s+)?MCQs", prompt)
+        topic_match = re.search(r"MCQs on (.+?)\.?\n", prompt)
+        shard_match = re.search(r"This is set (\d+) of", prompt)
+        count = int(count_match.group(1)) if count_match else 5
+        topic = topic_match.group(1).strip() if topic_match else "the topic"
+        # Shards of one quiz number their questions apart so they merge without duplicates,
+        # and questions listed as already asked are continued past rather than repeated
+        offset = (int(shard_match.group(1)) - 1) * 100 if shard_match else 0
+        asked = [int(number) for number in re.findall(r"^- Question (\d+) about", prompt, re.M)]
+        offset = max([offset] + asked)
+        questions = []
+        for number in range(offset + 1, offset + count + 1):
+            answer = self._pick(f"{prompt}:{number}", ["A", "B", "C", "D"])
+            questions.append({
+                "question": f"Question {number} about {topic}?",
+                "options": [
+                    {"key": key, "text": f"{topic} option {key}"} for key in ["A", "B", "C", "D"]
+                ],
+                "answer": answer,
+                "explanation": f"Option {answer} is correct for question {number} on {topic}.",
+            })
+        return json.dumps({"questions": questions}, indent=2)
+
+    def _packed_quiz(self, prompt: str):
+        topics_match = re.search(r"for EACH of these topics: (.+)", prompt)
+        topics = [topic.strip() for topic in topics_match.group(1).split(";")] if topics_match else []
+        count_match = re.search(r"(\d+)\s+(?:[\w-]+\s+)?MCQs", prompt)
+        count = count_match.group(1) if count_match else 5
+        quizzes = [
+            {"topic": topic, **json.loads(self._quiz(f"Generate {count} MCQs on {topic}.\n"))}
+            for topic in topics
+        ]
+        return json.dumps({"quizzes": quizzes}, indent=2)
+
+    def _plan(self, prompt: str):
+        segment = re.search(r"ONLY days (\d+) to (\d+)", prompt)
+        full = re.search(r"Create a (\d+)-day study plan for (.+?)\.?\n", prompt)
+        subject_match = re.search(r"study plan for (.+?)\.?\n", prompt)
+        subject = subject_match.group(1).strip() if subject_match else "the subject"
+        if segment:
+            first_day, last_day = int(segment.group(1)), int(segment.group(2))
+        else:
+            first_day, last_day = 1, int(full.group(1)) if full else 7
+        days = [
+            {
+                "day": day,
+                "topic": f"{subject} - part {day}",
+                "tasks": [f"Read about {subject} part {day}", f"Practice exercises for part {day}"],
+            }
+            for day in range(first_day, last_day + 1)
+        ]
+        return json.dumps({"days": days}, indent=2)
+
+    def _resources(self, prompt: str):
+        subject_match = re.search(r"Subject: (.+)", prompt)
+        subject = subject_match.group(1).strip() if subject_match else "the subject"
+        return (
+            f"YouTube:\n- {subject} crash course – a quick visual overview\n\n"
+            f"Articles:\n- A beginner's guide to {subject} – explains the core ideas\n\n"
+            f"Docs:\n- Official {subject} reference – https://example.com/{self._pick(subject, ['docs', 'reference', 'guide'])}\n"
+        )
+
+    def _explain(self, prompt: str):
+        topic_match = re.search(r"Topic: (.+)", prompt)
+        topic = topic_match.group(1).strip() if topic_match else "this topic"
+        return (
+            f"{topic} in simple terms: it is a way of breaking a big idea into smaller pieces.\n\n"
+            f"Example: think of how {topic} shows up in everyday study problems.\n\n"
+            f"Analogy: {topic} is like {self._pick(topic, ['a recipe', 'a map', 'a set of Russian dolls'])}."
+        )
+
+    def _respond(self, prompt: str):
+        if "MCQs for EACH" in prompt:
+            return self._packed_quiz(prompt)
+        if "MCQs" in prompt:
+            return self._quiz(prompt)
+        if "study plan" in prompt:
+            return self._plan(prompt)
+        if "learning resources" in prompt:
+            return self._resources(prompt)
+        return self._explain(prompt)
+
+    # ---------- backend interface ----------
+    def _complete(self, prompt: str):
+        text = self._respond(prompt)
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    async def generate(self, prompt: str):
+        await asyncio.sleep(self._latency_seconds())
+        self._maybe_fail()
+        return self._complete(prompt)
+
+    async def stream(self, prompt: str, usage: dict | None = None):
+        latency = self._latency_seconds()
+        self._maybe_fail()
+        completion = self._complete(prompt)
+        text = completion.text
+        chunks = [text[i:i + 80] for i in range(0, len(text), 80)] or [""]
+        for chunk in chunks:
+            await asyncio.sleep(latency / len(chunks))
+            yield chunk
+        if usage is not None:
+            usage["prompt_tokens"], usage["completion_tokens"] = completion.prompt_tokens, completion.completion_tokens
+
+
+def get_backend():
+    if LLM_BACKEND == "fake":
+        return FakeBackend()
+    if LLM_BACKEND == "gemini":
+        return GeminiBackend(GEMINI_MODEL)
+    raise RuntimeError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
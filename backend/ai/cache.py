@@ -0,0 +1,160 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------
+# CACHE CONFIG
+# -----------------------
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 60 * 60))
+# Path to a SQLite file for the on-disk tier; leave empty to keep the cache in memory only
+CACHE_DISK_PATH = os.getenv("LLM_CACHE_PATH", "")
+STALE_KEEP_FACTOR = 7
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Case and whitespace differences should not produce different cache entries
+    return " ".join(prompt.split()).lower()
+
+
+def make_cache_key(prompt: str, model_name: str) -> str:
+    raw = f"{model_name}\n{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """SQLite-backed tier so cached answers survive restarts."""
+
+    def __init__(self, path: str, max_age: float):
+        self.max_age = max_age
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str, ttl: float):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            value, created_at = row
+            if time.time() - created_at > ttl:
+                # Expired rows are kept as stale fallbacks until pruned
+                return None
+            return value, created_at
+
+    def set(self, key: str, value: str, created_at: float):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self.writes += 1
+            if self.writes % 500 == 0:
+                self.conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.max_age,)
+                )
+            self.conn.commit()
+
+
+class ResponseCache:
+    """
+    Two-tier LLM response cache: an in-process LRU with TTL in front of an
+    optional SQLite tier. Hit/miss counters are kept per route.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, disk_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (value, created_at)
+        self.lock = threading.Lock()
+        # Expired disk rows are kept a while longer as fallbacks for outages
+        self.disk = DiskCache(disk_path, ttl_seconds * STALE_KEEP_FACTOR) if disk_path else None
+        self.stats = {}
+
+    def _count(self, route: str, outcome: str):
+        route_stats = self.stats.setdefault(
+            route, {"hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0}
+        )
+        route_stats[outcome] += 1
+
+    def _remember(self, key: str, value: str, created_at: float):
+        self.entries[key] = (value, created_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str, route: str = "default", allow_stale: bool = False):
+        """
+        Return the cached value or None.
+        allow_stale=True also returns expired entries, used as a fallback
+        while the upstream model is unavailable.
+        """
+        now = time.time()
+        ttl = float("inf") if allow_stale else self.ttl_seconds
+        outcome = "stale_hits" if allow_stale else "hits"
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                value, created_at = entry
+                if now - created_at <= ttl:
+                    self.entries.move_to_end(key)
+                    self._count(route, outcome)
+                    return value
+                # Expired entries stay in memory as stale fallbacks until LRU-evicted
+
+        if self.disk:
+            stored = self.disk.get(key, ttl)
+            if stored:
+                value, created_at = stored
+                with self.lock:
+                    self._remember(key, value, created_at)
+                    self._count(route, outcome if allow_stale else "disk_hits")
+                return value
+
+        if not allow_stale:
+            with self.lock:
+                self._count(route, "misses")
+        return None
+
+    def contains(self, key: str):
+        """True if a fresh entry exists; unlike get() this does not touch LRU order or counters."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry[1] <= self.ttl_seconds:
+                return True
+        return bool(self.disk and self.disk.get(key, self.ttl_seconds))
+
+    def set(self, key: str, value: str):
+        created_at = time.time()
+        with self.lock:
+            self._remember(key, value, created_at)
+        if self.disk:
+            self.disk.set(key, value, created_at)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "enabled": CACHE_ENABLED,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": bool(self.disk),
+                "routes": {route: dict(counts) for route, counts in self.stats.items()},
+            }
+
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_DISK_PATH)
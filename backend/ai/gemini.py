@@ -1,14 +1,199 @@
 import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from ai.backends import get_backend
+from ai.cache import response_cache, make_cache_key, CACHE_ENABLED
+from ai.singleflight import SingleFlight
+from ai.resilience import breaker, call_with_resilience, LLMUnavailableError
+from ai.usage import usage
 
 load_dotenv()
 
-api_key = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=api_key)
+# Gemini, or the deterministic fake when LLM_BACKEND=fake
+backend = get_backend()
+MODEL_NAME = backend.model_name
+
+# -----------------------
+# CONCURRENCY CONFIG
+# -----------------------
+# How many Gemini calls may be in flight at once across the whole app
+MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+# How many callers may queue for a free slot before we reject new ones
+MAX_WAITING_CALLS = int(os.getenv("GEMINI_MAX_WAITING", 32))
+# How long (seconds) a queued caller waits for a slot before giving up
+QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", 15))
+# How long (seconds) a caller waits on a shared in-flight call for the same prompt
+COALESCE_TIMEOUT = float(os.getenv("GEMINI_COALESCE_TIMEOUT", 60))
+
+
+class LLMBusyError(Exception):
+    """Raised when the Gemini call queue is full or a slot could not be acquired in time."""
+
+
+_call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+_waiting_calls = 0
+_in_flight_calls = 0
+_single_flight = SingleFlight()
+
+
+@asynccontextmanager
+async def llm_slot():
+    """
+    Hold one of the global Gemini call slots for the duration of the block.
+    Applies backpressure: rejects immediately when too many callers are queued,
+    and gives up after QUEUE_TIMEOUT seconds of waiting.
+    """
+    global _waiting_calls, _in_flight_calls
+
+    if _waiting_calls >= MAX_WAITING_CALLS:
+        raise LLMBusyError("Too many AI requests queued")
+
+    _waiting_calls += 1
+    try:
+        await asyncio.wait_for(_call_slots.acquire(), timeout=QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise LLMBusyError("Timed out waiting for a free AI slot")
+    finally:
+        _waiting_calls -= 1
+
+    _in_flight_calls += 1
+    try:
+        yield
+    finally:
+        _in_flight_calls -= 1
+        _call_slots.release()
+
+
+def get_llm_stats():
+    return {
+        "backend": backend.name,
+        "model": MODEL_NAME,
+        "max_concurrent_calls": MAX_CONCURRENT_CALLS,
+        "max_waiting_calls": MAX_WAITING_CALLS,
+        "in_flight": _in_flight_calls,
+        "waiting": _waiting_calls,
+        "coalescing": _single_flight.get_stats(),
+    }
+
+
+async def generate_text_async(prompt: str, route: str = "default", use_cache: bool = False):
+    """
+    Generate text without blocking the event loop.
+    route names the caller (e.g. "explain") for its latency budget and stats;
+    use_cache opts the call into the response cache.
+    Concurrent calls with the same prompt share a single upstream request.
+    While the upstream is unhealthy a stale cached answer is served if one exists.
+    Every call is recorded in the usage accounting with its tokens and cache outcome.
+    """
+    started = time.monotonic()
+    use_cache = use_cache and CACHE_ENABLED
+    cache_key = make_cache_key(prompt, MODEL_NAME)
+    if use_cache:
+        cached = response_cache.get(cache_key, route)
+        if cached is not None:
+            usage.record(route, time.monotonic() - started, "hit")
+            return cached
+
+    # Tokens of every upstream attempt this caller made (retries and hedges included)
+    spent = {"led": False, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def attempt():
+        async with llm_slot():
+            completion = await backend.generate(prompt)
+        spent["prompt_tokens"] += completion.prompt_tokens
+        spent["completion_tokens"] += completion.completion_tokens
+        return completion.text
+
+    async def call_model():
+        spent["led"] = True
+        text = await call_with_resilience(
+            route, attempt, can_hedge=lambda: not _call_slots.locked(), local_errors=(LLMBusyError,)
+        )
+        if use_cache:
+            response_cache.set(cache_key, text)
+        return text
+
+    def record(outcome=None, error=None):
+        if outcome is None:
+            # Callers that only waited on someone else's identical call spent no tokens
+            outcome = ("miss" if use_cache else "bypass") if spent["led"] else "coalesced"
+        usage.record(
+            route, time.monotonic() - started, outcome,
+            spent["prompt_tokens"], spent["completion_tokens"], error,
+        )
+
+    try:
+        text = await _single_flight.do(cache_key, call_model, COALESCE_TIMEOUT)
+    except asyncio.TimeoutError:
+        record(error="LLMBusyError")
+        raise LLMBusyError("Timed out waiting for a shared AI response")
+    except LLMUnavailableError as e:
+        if use_cache:
+            stale = response_cache.get(cache_key, route, allow_stale=True)
+            if stale is not None:
+                record("stale", type(e).__name__)
+                return stale
+        record(error=type(e).__name__)
+        raise
+    except Exception as e:
+        record(error=type(e).__name__)
+        raise
+    record()
+    return text
+
+
+async def stream_text_async(prompt: str, route: str = "default", use_cache: bool = False):
+    """
+    Async generator yielding text chunks as Gemini produces them.
+    A cached answer is yielded as a single chunk; a fully streamed answer is cached.
+    Streams are not retried or hedged (chunks may already be sent), but they
+    respect and feed the circuit breaker.
+    """
+    started = time.monotonic()
+    use_cache = use_cache and CACHE_ENABLED
+    cache_key = make_cache_key(prompt, MODEL_NAME)
+    if use_cache:
+        cached = response_cache.get(cache_key, route)
+        if cached is not None:
+            usage.record(route, time.monotonic() - started, "hit")
+            yield cached
+            return
+
+    if not breaker.allow():
+        stale = response_cache.get(cache_key, route, allow_stale=True) if use_cache else None
+        if stale is None:
+            usage.record(route, time.monotonic() - started, "miss", error="LLMUnavailableError")
+            raise LLMUnavailableError("AI service is temporarily unavailable")
+        usage.record(route, time.monotonic() - started, "stale", error="LLMUnavailableError")
+        yield stale
+        return
 
-model = genai.GenerativeModel("gemini-2.5-flash-lite")
+    chunks = []
+    tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+    outcome = "miss" if use_cache else "bypass"
+    try:
+        async with llm_slot():
+            async for chunk in backend.stream(prompt, usage=tokens):
+                chunks.append(chunk)
+                yield chunk
+    except LLMBusyError as e:
+        breaker.cancel_trial()
+        usage.record(route, time.monotonic() - started, outcome, error=type(e).__name__)
+        raise
+    except (GeneratorExit, asyncio.CancelledError):
+        # Client went away mid-stream; not an upstream failure
+        breaker.cancel_trial()
+        usage.record(route, time.monotonic() - started, outcome, **tokens, error="Cancelled")
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        usage.record(route, time.monotonic() - started, outcome, **tokens, error=type(e).__name__)
+        raise
+    breaker.record_success()
+    usage.record(route, time.monotonic() - started, outcome, **tokens)
 
-def generate_text(prompt: str):
-    response = model.generate_content(prompt)
-    return response.text
+    if use_cache:
+        response_cache.set(cache_key, "".join(chunks))
@@ -0,0 +1,179 @@
+import os
+import copy
+import asyncio
+from collections import Counter
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ai.planner import generate_plan
+from database.session import with_session
+from models.plan_template import PlanTemplate
+from utils.topics import canonical_topic
+
+load_dotenv()
+
+# -----------------------
+# PLAN TEMPLATE CONFIG
+# -----------------------
+PLAN_TEMPLATES_ENABLED = os.getenv("PLAN_TEMPLATES_ENABLED", "true").lower() == "true"
+# A (subject, days) pair gets a template once it has needed this many full generations
+PLAN_TEMPLATE_MIN_REQUESTS = int(os.getenv("PLAN_TEMPLATE_MIN_REQUESTS", 2))
+# At most this share of a plan's days may be written by the small weak-area call;
+# plans needing more than that are generated in full
+PLAN_TEMPLATE_MAX_NEW_DAYS_RATIO = 0.3
+# Share of a weak area's words a day must mention to count as covering it
+AREA_MATCH_RATIO = 0.5
+
+_misses = Counter()
+_creating = set()
+_create_tasks = set()
+_stats = {"template_only": 0, "template_plus_llm": 0, "full_generations": 0, "templates_created": 0}
+
+
+def _words(text: str):
+    return {word for word in canonical_topic(text).split() if len(word) > 2}
+
+
+def covers(day: dict, area: str):
+    area_words = _words(area)
+    if not area_words:
+        return False
+    day_words = _words(" ".join([str(day.get("topic", ""))] + [str(task) for task in day.get("tasks", [])]))
+    return len(area_words & day_words) / len(area_words) >= AREA_MATCH_RATIO
+
+
+def spread_slots(total_days: int, count: int):
+    """Day indexes spread evenly through the plan, keeping the first and last day."""
+    inner = list(range(1, total_days - 1)) or list(range(total_days))
+    step = len(inner) / (count + 1)
+    return sorted({inner[min(int(step * (i + 1)), len(inner) - 1)] for i in range(count)})
+
+
+async def specialize(subject: str, weak_areas: list[str], template_days: list[dict], total_days: int):
+    """
+    Tailor a generic plan to the student's weak areas. Days that already cover
+    a weak area get an extra focused practice task; weak areas no day covers
+    get new days from one small model call, placed evenly through the plan.
+    Returns (plan_data, used_llm), or None when too much would be rewritten.
+    """
+    days = copy.deepcopy(template_days)[:total_days]
+    if len(days) < total_days:
+        return None
+
+    uncovered = []
+    for area in weak_areas:
+        matching = [day for day in days if covers(day, area)]
+        if not matching:
+            uncovered.append(area)
+        for day in matching:
+            day.setdefault("tasks", []).append(f"Extra practice on {area} (focus area)")
+
+    used_llm = False
+    if uncovered:
+        if len(uncovered) > max(1, int(total_days * PLAN_TEMPLATE_MAX_NEW_DAYS_RATIO)):
+            return None
+        context = (
+            "Write exactly one day per weak area listed above. "
+            "These days will be inserted into a longer existing plan."
+        )
+        generated = await generate_plan(subject, uncovered, len(uncovered), context)
+        new_days = generated.get("days", [])
+        for index, new_day in zip(spread_slots(total_days, len(new_days)), new_days):
+            days[index] = new_day
+        used_llm = True
+
+    for number, day in enumerate(days, start=1):
+        day["day"] = number
+    return {"days": days}, used_llm
+
+
+def find_template(db: Session, subject: str, total_days: int):
+    """The (subject, days) template's (id, plan_data) row; None if there is no template yet."""
+    return db.query(PlanTemplate.id, PlanTemplate.plan_data).filter(
+        PlanTemplate.subject_key == canonical_topic(subject),
+        PlanTemplate.total_days == total_days,
+    ).first()
+
+
+def count_template_use(db: Session, template_id: int):
+    # Incremented in the UPDATE itself so concurrent plan requests do not lose counts
+    db.query(PlanTemplate).filter(PlanTemplate.id == template_id).update(
+        {PlanTemplate.uses: func.coalesce(PlanTemplate.uses, 0) + 1}, synchronize_session=False
+    )
+    db.commit()
+
+
+def save_template(db: Session, subject: str, total_days: int, plan_data: dict):
+    db.add(PlanTemplate(
+        subject_key=canonical_topic(subject), total_days=total_days, subject=subject.strip(), plan_data=plan_data
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker stored the template first
+        db.rollback()
+
+
+def schedule_template(subject: str, total_days: int):
+    key = (canonical_topic(subject), total_days)
+    if key in _creating:
+        return
+    _creating.add(key)
+
+    async def create():
+        try:
+            plan_data = await generate_plan(subject, [], total_days)
+            if len(plan_data.get("days", [])) == total_days:
+                await run_in_threadpool(with_session, save_template, subject, total_days, plan_data)
+                _stats["templates_created"] += 1
+        except Exception as e:
+            print(f"⚠️ Plan template generation failed for {key}: {e!r}")
+        finally:
+            _creating.discard(key)
+
+    task = asyncio.create_task(create())
+    _create_tasks.add(task)
+    task.add_done_callback(_create_tasks.discard)
+
+
+async def build_study_plan(subject: str, weak_areas: list[str], total_days: int):
+    """
+    plan_data for a new plan: specialized from the (subject, total_days)
+    template when there is one, otherwise a full generation. Combinations
+    that keep needing full generations get a template built in the background.
+    Raises JSONExtractionError like generate_plan.
+    """
+    if PLAN_TEMPLATES_ENABLED:
+        template = await run_in_threadpool(with_session, find_template, subject, total_days)
+        if template:
+            specialized = await specialize(subject, weak_areas, template.plan_data.get("days", []), total_days)
+            if specialized:
+                # Only plans actually built from the template count as uses
+                await run_in_threadpool(with_session, count_template_use, template.id)
+                plan_data, used_llm = specialized
+                _stats["template_plus_llm" if used_llm else "template_only"] += 1
+                return plan_data
+
+    plan_data = await generate_plan(subject, weak_areas, total_days)
+    _stats["full_generations"] += 1
+
+    if PLAN_TEMPLATES_ENABLED:
+        key = (canonical_topic(subject), total_days)
+        _misses[key] += 1
+        if _misses[key] >= PLAN_TEMPLATE_MIN_REQUESTS:
+            del _misses[key]
+            schedule_template(subject, total_days)
+    return plan_data
+
+
+def get_template_stats():
+    total = _stats["template_only"] + _stats["template_plus_llm"] + _stats["full_generations"]
+    avoided = _stats["template_only"] + _stats["template_plus_llm"]
+    return {
+        "enabled": PLAN_TEMPLATES_ENABLED,
+        "full_generation_avoided_rate": round(avoided / total, 3) if total else None,
+        **_stats,
+    }
@@ -0,0 +1,178 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from ai.gemini import generate_text_async
+from utils.json_extract import extract_json
+
+load_dotenv()
+
+# -----------------------
+# SHARDING CONFIG
+# -----------------------
+# Plans longer than this are generated as concurrent week-sized segments
+SHARD_THRESHOLD_DAYS = int(os.getenv("PLAN_SHARD_THRESHOLD_DAYS", 10))
+SEGMENT_DAYS = int(os.getenv("PLAN_SEGMENT_DAYS", 7))
+
+
+def build_plan_prompt(subject: str, weak_areas: list[str], total_days: int, context: str = ""):
+    return f"""
+Create a {total_days}-day study plan for {subject}.
+Weak areas: {", ".join(weak_areas)}
+{context}
+
+Return ONLY JSON in this format:
+{{
+  "days": [
+    {{
+      "day": 1,
+      "topic": "Topic name",
+      "tasks": ["Task 1", "Task 2"]
+    }}
+  ]
+}}
+"""
+
+
+def split_segments(total_days: int):
+    """Return (first_day, last_day) pairs covering 1..total_days in week-sized chunks."""
+    segments = []
+    first_day = 1
+    while first_day <= total_days:
+        last_day = min(first_day + SEGMENT_DAYS - 1, total_days)
+        segments.append((first_day, last_day))
+        first_day = last_day + 1
+
+    # Fold a tiny leftover (e.g. day 29-30) into the previous segment
+    if len(segments) > 1 and segments[-1][1] - segments[-1][0] + 1 < SEGMENT_DAYS // 2:
+        last = segments.pop()
+        segments[-1] = (segments[-1][0], last[1])
+    return segments
+
+
+def assign_segment_focus(weak_areas: list[str], segment_count: int):
+    """Spread weak areas round-robin across segments so each week has its own focus."""
+    focus = [[] for _ in range(segment_count)]
+    for index, area in enumerate(weak_areas):
+        focus[index % segment_count].append(area)
+    return focus
+
+
+def build_segment_prompt(subject, weak_areas, total_days, segment, segment_index, segment_focus, context=""):
+    first_day, last_day = segment
+    segment_count = len(segment_focus)
+
+    # Shared context: every segment sees the whole plan's outline
+    outline = "\n".join(
+        f"- Part {index + 1}: {', '.join(areas) if areas else 'core concepts and practice'}"
+        for index, areas in enumerate(segment_focus)
+    )
+    if segment_index == segment_count - 1:
+        role = "This is the final part: finish the remaining material and end with revision and practice."
+    elif segment_index == 0:
+        role = "This is the first part: start with foundations before the focus areas."
+    else:
+        role = "Build on earlier parts; do not repeat their topics."
+
+    return f"""
+You are writing part {segment_index + 1} of {segment_count} of a {total_days}-day study plan for {subject}.
+Overall weak areas: {", ".join(weak_areas)}
+
+Plan outline:
+{outline}
+{context}
+
+Write ONLY days {first_day} to {last_day} (inclusive).
+{role}
+
+Return ONLY JSON in this format:
+{{
+  "days": [
+    {{
+      "day": {first_day},
+      "topic": "Topic name",
+      "tasks": ["Task 1", "Task 2"]
+    }}
+  ]
+}}
+"""
+
+
+def merge_segments(segment_plans: list[dict], segments: list[tuple]):
+    """Concatenate segment days in order and renumber them 1..N."""
+    days = []
+    for plan, (first_day, last_day) in zip(segment_plans, segments):
+        segment_days = plan.get("days", [])[: last_day - first_day + 1]
+        days.extend(segment_days)
+
+    for number, day in enumerate(days, start=1):
+        day["day"] = number
+    return {"days": days}
+
+
+async def generate_plan(subject: str, weak_areas: list[str], total_days: int, context: str = ""):
+    """
+    Generate plan_data for a study plan.
+    Long plans are split into week-sized segments generated concurrently,
+    so latency is roughly that of one segment.
+    Raises JSONExtractionError when the model output cannot be parsed.
+    """
+    if total_days <= SHARD_THRESHOLD_DAYS:
+        raw = await generate_text_async(build_plan_prompt(subject, weak_areas, total_days, context), route="plan")
+        return extract_json(raw, allow_partial=True)
+
+    segments = split_segments(total_days)
+    segment_focus = assign_segment_focus(weak_areas, len(segments))
+    prompts = [
+        build_segment_prompt(subject, weak_areas, total_days, segment, index, segment_focus, context)
+        for index, segment in enumerate(segments)
+    ]
+
+    raw_segments = await asyncio.gather(*(generate_text_async(prompt, route="plan") for prompt in prompts))
+    segment_plans = [extract_json(raw, allow_partial=True) for raw in raw_segments]
+    return merge_segments(segment_plans, segments)
+
+
+async def regenerate_remaining_days(
+    subject: str,
+    weak_areas: list[str],
+    plan_data: dict,
+    total_days: int,
+    completed_days: list[int],
+):
+    """
+    Regenerate only the days the student has not completed yet.
+    Completed days are kept as-is; the model is asked for just the remaining
+    days, which are slotted back into the remaining day numbers in order.
+    """
+    existing_days = {day.get("day"): day for day in (plan_data or {}).get("days", [])}
+    completed = set(completed_days)
+    remaining_numbers = [number for number in range(1, total_days + 1) if number not in completed]
+    if not remaining_numbers:
+        return plan_data
+
+    covered_topics = [
+        existing_days[number].get("topic", "")
+        for number in sorted(completed)
+        if number in existing_days
+    ]
+    context = (
+        f"The student already finished these topics: {', '.join(covered_topics)}.\n"
+        "Continue from there without repeating them."
+        if covered_topics else ""
+    )
+
+    generated = await generate_plan(subject, weak_areas, len(remaining_numbers), context)
+    # Generated days fill the remaining day numbers in order; if the model
+    # returned fewer days than asked for, the old days stay in the leftover slots
+    replacements = dict(zip(remaining_numbers, generated.get("days", [])))
+
+    days = []
+    for number in range(1, total_days + 1):
+        day = replacements.get(number) or existing_days.get(number)
+        if day is None:
+            continue
+        day["day"] = number
+        days.append(day)
+
+    return {"days": days}
@@ -0,0 +1,133 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+from ai.gemini import get_llm_stats
+from ai.resilience import breaker
+from ai.usage import token_meter
+from utils.topics import canonical_topic
+
+load_dotenv()
+
+# -----------------------
+# PRE-WARM CONFIG
+# -----------------------
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() == "true"
+PREWARM_TOP_K = int(os.getenv("PREWARM_TOP_K", 10))
+PREWARM_INTERVAL_SECONDS = float(os.getenv("PREWARM_INTERVAL_SECONDS", 60))
+# Tokens pre-warming may spend per hour
+PREWARM_TOKEN_BUDGET = int(os.getenv("PREWARM_TOKEN_BUDGET", 20000))
+# Only warm while at most this many user calls are in flight and none are queued
+PREWARM_IDLE_IN_FLIGHT = int(os.getenv("PREWARM_IDLE_IN_FLIGHT", 1))
+# Each tick multiplies counts by this so yesterday's spike fades out
+PREWARM_DECAY = 0.9
+MAX_TRACKED_TOPICS = 5000
+
+
+class Prewarmer:
+    """
+    Tracks how often topics are requested and, while the model is idle,
+    pre-generates content for the most popular ones so peak-hour requests
+    hit the cache or question bank. Each kind of content registers a warmer:
+    an async fn(value) that fills the normal response path and returns False
+    when the content was already warm. Tokens are metered from the model calls
+    the warmer makes.
+    """
+
+    def __init__(self, top_k: int, token_budget: int, interval: float):
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.interval = interval
+        self.counts = {}  # (kind, canonical topic) -> [score, latest raw value]
+        self.warmers = {}
+        self.task = None
+        self.window_started = time.monotonic()
+        self.tokens_used = 0
+        self.stats = {"ticks": 0, "warmed": 0, "already_warm": 0, "skipped_busy": 0, "budget_stops": 0, "failed": 0}
+
+    def register(self, kind: str, warmer):
+        self.warmers[kind] = warmer
+
+    def record(self, kind: str, value: str):
+        key = canonical_topic(value)
+        if not key:
+            return
+        entry = self.counts.setdefault((kind, key), [0.0, value])
+        entry[0] += 1
+        entry[1] = value
+        if len(self.counts) > MAX_TRACKED_TOPICS:
+            # Forget the least requested half
+            keep = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)[:MAX_TRACKED_TOPICS // 2]
+            self.counts = dict(keep)
+
+    def top(self, k: int):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)
+        return [(kind, value, score) for (kind, _), (score, value) in ranked if kind in self.warmers][:k]
+
+    def is_idle(self):
+        llm = get_llm_stats()
+        return llm["in_flight"] <= PREWARM_IDLE_IN_FLIGHT and llm["waiting"] == 0 and breaker.state == "closed"
+
+    def _budget_left(self):
+        if time.monotonic() - self.window_started >= 3600:
+            self.window_started = time.monotonic()
+            self.tokens_used = 0
+        return self.token_budget - self.tokens_used
+
+    async def run_once(self):
+        self.stats["ticks"] += 1
+        for kind, value, _ in self.top(self.top_k):
+            if self._budget_left() <= 0:
+                self.stats["budget_stops"] += 1
+                break
+            if not self.is_idle():
+                self.stats["skipped_busy"] += 1
+                break
+            meter = [0]
+            reset = token_meter.set(meter)
+            try:
+                warmed = await self.warmers[kind](value)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"⚠️ Pre-warm failed for {kind} '{value}': {e!r}")
+                continue
+            finally:
+                token_meter.reset(reset)
+                self.tokens_used += meter[0]
+            self.stats["warmed" if warmed else "already_warm"] += 1
+
+        for entry in self.counts.values():
+            entry[0] *= PREWARM_DECAY
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self):
+        if self.task is None and PREWARM_ENABLED:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def get_stats(self):
+        return {
+            "enabled": PREWARM_ENABLED,
+            "running": self.task is not None,
+            "tracked_topics": len(self.counts),
+            "tokens_used_this_hour": self.tokens_used,
+            "token_budget_per_hour": self.token_budget,
+            "top": [
+                {"kind": kind, "topic": value, "score": round(score, 2)}
+                for kind, value, score in self.top(self.top_k)
+            ],
+            **self.stats,
+        }
+
+
+prewarmer = Prewarmer(PREWARM_TOP_K, PREWARM_TOKEN_BUDGET, PREWARM_INTERVAL_SECONDS)
@@ -0,0 +1,200 @@
+import os
+import hashlib
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ai.gemini import LLMBusyError
+from ai.resilience import LLMUnavailableError
+from ai.quiz_generator import generate_quiz, normalize_question, QUIZ_SHARD_SIZE
+from database.session import with_session
+from models.question_bank import BankQuestion, SeenQuestion
+from utils.topics import canonical_topic
+
+load_dotenv()
+
+# -----------------------
+# QUESTION BANK CONFIG
+# -----------------------
+QUIZ_BANK_ENABLED = os.getenv("QUIZ_BANK_ENABLED", "true").lower() == "true"
+# A top-up asks the model for at least this many questions so the bank grows in useful steps
+QUIZ_BANK_TOPUP_MIN = int(os.getenv("QUIZ_BANK_TOPUP_MIN", 5))
+# Recent bank questions listed in a top-up prompt so the model writes new ones
+QUIZ_BANK_AVOID_LIMIT = 15
+# Pre-warming tops a popular topic up until the bank holds this many questions
+PREWARM_BANK_MIN_QUESTIONS = int(os.getenv("PREWARM_BANK_MIN_QUESTIONS", 20))
+
+_stats = {"bank_only": 0, "topped_up": 0, "questions_from_bank": 0, "questions_generated": 0}
+
+
+def question_hash(text: str) -> str:
+    return hashlib.sha1(normalize_question(text).encode("utf-8")).hexdigest()
+
+
+def _insert_ignoring_duplicates(db: Session, rows: list):
+    """Insert rows, skipping any that hit a unique constraint (e.g. a concurrent insert)."""
+    if not rows:
+        return
+    try:
+        db.add_all(rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.add(row)
+            except IntegrityError:
+                pass
+        db.commit()
+
+
+def add_questions(db: Session, topic: str, questions: list, difficulty: str | None = None):
+    """
+    Store well-formed model-generated MCQs for a topic and difficulty,
+    skipping ones already in the bank. Returns how many were new.
+    """
+    topic_key = canonical_topic(topic)
+    by_hash = {}
+    for question in questions:
+        if not isinstance(question, dict) or not question.get("question") or not question.get("options"):
+            continue
+        by_hash.setdefault(question_hash(str(question["question"])), question)
+    if not topic_key or not by_hash:
+        return 0
+
+    existing = {
+        row.question_hash
+        for row in db.query(BankQuestion.question_hash).filter(
+            BankQuestion.topic_key == topic_key,
+            func.coalesce(BankQuestion.difficulty, "") == (difficulty or ""),
+            BankQuestion.question_hash.in_(list(by_hash)),
+        )
+    }
+    rows = [
+        BankQuestion(
+            topic_key=topic_key,
+            topic=topic.strip(),
+            difficulty=difficulty,
+            question_hash=digest,
+            question={key: question.get(key) for key in ("question", "options", "answer", "explanation")},
+        )
+        for digest, question in by_hash.items()
+        if digest not in existing
+    ]
+    _insert_ignoring_duplicates(db, rows)
+    return len(rows)
+
+
+def sample_questions(db: Session, topic: str, count: int, difficulty: str | None, user_id: int | None, exclude_ids=()):
+    """Random unseen questions for the user from one indexed topic lookup."""
+    query = db.query(BankQuestion).filter(BankQuestion.topic_key == canonical_topic(topic))
+    if difficulty:
+        query = query.filter(BankQuestion.difficulty == difficulty)
+    if user_id:
+        query = query.filter(~exists().where(
+            (SeenQuestion.user_id == user_id) & (SeenQuestion.question_id == BankQuestion.id)
+        ))
+    if exclude_ids:
+        query = query.filter(BankQuestion.id.notin_(list(exclude_ids)))
+    # Without a difficulty the same question can come back once per difficulty; keep one copy
+    picked = {}
+    for row in query.order_by(func.random()).limit(count):
+        picked.setdefault(row.question_hash, (row.id, row.question))
+    return list(picked.values())
+
+
+def count_questions(db: Session, topic: str):
+    return db.query(BankQuestion).filter(BankQuestion.topic_key == canonical_topic(topic)).count()
+
+
+def recent_question_texts(db: Session, topic: str, limit: int = QUIZ_BANK_AVOID_LIMIT):
+    rows = (
+        db.query(BankQuestion.question)
+        .filter(BankQuestion.topic_key == canonical_topic(topic))
+        .order_by(BankQuestion.id.desc())
+        .limit(limit)
+    )
+    return [row.question.get("question", "") for row in rows]
+
+
+def mark_seen(db: Session, user_id: int, question_ids: list):
+    _insert_ignoring_duplicates(
+        db, [SeenQuestion(user_id=user_id, question_id=question_id) for question_id in question_ids]
+    )
+
+
+async def _serve(picked: list, user_id: int | None):
+    if user_id and picked:
+        await run_in_threadpool(with_session, mark_seen, user_id, [qid for qid, _ in picked])
+    return {"questions": [question for _, question in picked]}
+
+
+async def quiz_from_bank(topic: str, count: int = 5, difficulty: str | None = None, user_id: int | None = None):
+    """A whole quiz from bank questions the user has not seen, or None when the bank can't fill it."""
+    if not QUIZ_BANK_ENABLED:
+        return None
+    picked = await run_in_threadpool(with_session, sample_questions, topic, count, difficulty, user_id)
+    if len(picked) < count:
+        return None
+    _stats["bank_only"] += 1
+    _stats["questions_from_bank"] += len(picked)
+    return await _serve(picked, user_id)
+
+
+async def assemble_quiz(topic: str, count: int = 5, difficulty: str | None = None, user_id: int | None = None):
+    """
+    Build a quiz from bank questions the user has not seen yet. The model is
+    only called when the bank is too thin, and its questions are stored so the
+    next request for the topic is a single DB read.
+    """
+    if not QUIZ_BANK_ENABLED:
+        return await generate_quiz(topic, count, difficulty)
+
+    picked = await run_in_threadpool(with_session, sample_questions, topic, count, difficulty, user_id)
+    missing = count - len(picked)
+    _stats["questions_from_bank"] += len(picked)
+
+    if missing > 0:
+        avoid = await run_in_threadpool(with_session, recent_question_texts, topic)
+        try:
+            generated = await generate_quiz(topic, max(missing, QUIZ_BANK_TOPUP_MIN), difficulty, avoid=avoid)
+        except (LLMBusyError, LLMUnavailableError):
+            # Serve what the bank has rather than failing the whole quiz
+            if not picked:
+                raise
+            generated = {"questions": []}
+        await run_in_threadpool(with_session, add_questions, topic, generated["questions"], difficulty)
+        picked += await run_in_threadpool(
+            with_session, sample_questions, topic, missing, difficulty, user_id, [qid for qid, _ in picked]
+        )
+        _stats["topped_up"] += 1
+        _stats["questions_generated"] += len(generated["questions"])
+    else:
+        _stats["bank_only"] += 1
+
+    return await _serve(picked, user_id)
+
+
+async def bank_generated(topic: str, questions: list, difficulty: str | None = None):
+    """Store questions generated outside assemble_quiz (a packed batch call) as a top-up of the topic."""
+    await run_in_threadpool(with_session, add_questions, topic, questions, difficulty)
+    _stats["topped_up"] += 1
+    _stats["questions_generated"] += len(questions)
+
+
+async def warm_topic(topic: str):
+    """Pre-warm hook: grow the bank for a popular topic while the model is idle."""
+    if await run_in_threadpool(with_session, count_questions, topic) >= PREWARM_BANK_MIN_QUESTIONS:
+        return False
+    avoid = await run_in_threadpool(with_session, recent_question_texts, topic)
+    generated = await generate_quiz(topic, QUIZ_SHARD_SIZE, avoid=avoid)
+    await run_in_threadpool(with_session, add_questions, topic, generated["questions"])
+    _stats["questions_generated"] += len(generated["questions"])
+    return True
+
+
+def get_bank_stats():
+    return dict(_stats)
@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import zlib
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------
+# NEAR-DUPLICATE INDEX CONFIG
+# -----------------------
+EXPLAIN_INDEX_ENABLED = os.getenv("EXPLAIN_INDEX_ENABLED", "true").lower() == "true"
+# Estimated Jaccard similarity of question shingles needed to reuse an answer
+EXPLAIN_INDEX_THRESHOLD = float(os.getenv("EXPLAIN_INDEX_THRESHOLD", 0.8))
+EXPLAIN_INDEX_MAX_ENTRIES = int(os.getenv("EXPLAIN_INDEX_MAX_ENTRIES", 20000))
+# SQLite file the index is saved to; leave empty to start with an empty index on each restart
+EXPLAIN_INDEX_PATH = os.getenv("EXPLAIN_INDEX_PATH", "")
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: near-certain recall at 0.8 similarity, few candidates below 0.5
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Stopwords and request phrasing that never change what is being asked about
+FILLER_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "of", "in", "on", "to", "and", "for",
+    "explain", "tell", "me", "us", "about", "please", "pls", "can", "could", "you", "i",
+    "simply", "briefly",
+}
+# Leading question phrasing still there after FILLER_WORDS ("what is" leaves "what", "what's" leaves "what s")
+QUESTION_PHRASING = re.compile(r"^(?:what(?: s)?|how (?:does|do|did))(?: |$)")
+# Sentence punctuation only; symbols such as # + . - / stay because they name things (C#, C++, .NET)
+PUNCTUATION = re.compile(r"[?!,;:'\"()\[\]{}]|\.(?=\s|$)")
+
+# Multiply-shift hash family over 32-bit shingle hashes; fixed seed so signatures are stable across restarts
+_random = random.Random(1)
+_HASHES = [(_random.getrandbits(32) | 1, _random.getrandbits(32)) for _ in range(NUM_PERM)]
+
+
+def normalize_question(text: str) -> str:
+    words = PUNCTUATION.sub(" ", text.lower()).split()
+    return QUESTION_PHRASING.sub("", " ".join(word for word in words if word not in FILLER_WORDS))
+
+
+def exact_terms(normalized: str):
+    """Words containing symbols or digits (c#, c++, .net, ww2, 1945); a match must agree on them exactly."""
+    return frozenset(
+        word for word in normalized.split()
+        if not word.replace("_", "").isalnum() or any(char.isdigit() for char in word)
+    )
+
+
+def shingles(normalized: str):
+    padded = f" {normalized} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {padded}
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def minhash(normalized: str):
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(normalized)]
+    return tuple(min([((a * h + b) >> 16) & 0xFFFFFFFF for h in hashes]) for a, b in _HASHES)
+
+
+def similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+class IndexStore:
+    """SQLite file holding indexed questions so the index survives restarts."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS explain_index ("
+            "normalized TEXT PRIMARY KEY, question TEXT NOT NULL, answer TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def load(self, limit: int):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT question, answer FROM explain_index ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return list(reversed(rows))
+
+    def save(self, normalized: str, question: str, answer: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO explain_index (normalized, question, answer, created_at) VALUES (?, ?, ?, ?)",
+                (normalized, question, answer, time.time()),
+            )
+            self.conn.commit()
+
+    def delete(self, normalized: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM explain_index WHERE normalized = ?", (normalized,))
+            self.conn.commit()
+
+
+class MinHashIndex:
+    """
+    Near-duplicate lookup for explain questions. Each question is reduced to
+    character shingles of its filler-free text, summarised as a MinHash
+    signature and bucketed by LSH bands; a lookup only compares against
+    questions sharing at least one band. The index keeps at most max_entries
+    questions and evicts the least recently used.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, path: str = ""):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # normalized -> (signature, question, answer, exact terms)
+        self.buckets = [{} for _ in range(BANDS)]  # band value -> set of normalized keys
+        self.lock = threading.Lock()
+        self.store = IndexStore(path) if path else None
+        self.stats = {"lookups": 0, "hits": 0, "exact_hits": 0, "inserts": 0, "evictions": 0}
+        if self.store:
+            for question, answer in self.store.load(max_entries):
+                self.insert(question, answer, persist=False)
+
+    @staticmethod
+    def _bands(signature):
+        return [signature[band * ROWS:(band + 1) * ROWS] for band in range(BANDS)]
+
+    def _remove(self, normalized: str):
+        signature = self.entries.pop(normalized)[0]
+        for band, value in enumerate(self._bands(signature)):
+            keys = self.buckets[band].get(value)
+            if keys:
+                keys.discard(normalized)
+                if not keys:
+                    del self.buckets[band][value]
+
+    def insert(self, question: str, answer: str, persist: bool = True):
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        with self.lock:
+            if normalized in self.entries:
+                self._remove(normalized)
+            signature = minhash(normalized)
+            self.entries[normalized] = (signature, question, answer, exact_terms(normalized))
+            for band, value in enumerate(self._bands(signature)):
+                self.buckets[band].setdefault(value, set()).add(normalized)
+            while len(self.entries) > self.max_entries:
+                evicted = next(iter(self.entries))
+                self._remove(evicted)
+                self.stats["evictions"] += 1
+                if self.store:
+                    self.store.delete(evicted)
+            self.stats["inserts"] += 1
+        if persist and self.store:
+            self.store.save(normalized, question, answer)
+
+    def lookup(self, question: str):
+        """Return (stored question, answer, similarity) for the closest match above the threshold, or None."""
+        normalized = normalize_question(question)
+        with self.lock:
+            self.stats["lookups"] += 1
+            if not normalized:
+                return None
+
+            entry = self.entries.get(normalized)
+            if entry:
+                self.entries.move_to_end(normalized)
+                self.stats["hits"] += 1
+                self.stats["exact_hits"] += 1
+                return entry[1], entry[2], 1.0
+
+            signature = minhash(normalized)
+            terms = exact_terms(normalized)
+            candidates = set()
+            for band, value in enumerate(self._bands(signature)):
+                candidates |= self.buckets[band].get(value, set())
+
+            best, best_score = None, 0.0
+            for key in candidates:
+                if self.entries[key][3] != terms:
+                    continue
+                score = similarity(signature, self.entries[key][0])
+                if score > best_score:
+                    best, best_score = key, score
+            if best is None or best_score < self.threshold:
+                return None
+
+            self.entries.move_to_end(best)
+            self.stats["hits"] += 1
+            _, stored_question, answer, _ = self.entries[best]
+            return stored_question, answer, best_score
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.stats["lookups"]
+            return {
+                "enabled": EXPLAIN_INDEX_ENABLED,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "persistent": bool(self.store),
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+                **self.stats,
+            }
+
+
+explain_index = MinHashIndex(EXPLAIN_INDEX_THRESHOLD, EXPLAIN_INDEX_MAX_ENTRIES, EXPLAIN_INDEX_PATH)
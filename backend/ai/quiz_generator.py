@@ -0,0 +1,194 @@
+import os
+import re
+import asyncio
+from dotenv import load_dotenv
+
+from ai.gemini import generate_text_async, stream_text_async
+from utils.json_extract import extract_json, JSONExtractionError
+from utils.json_stream import IncrementalArrayParser
+
+load_dotenv()
+
+# -----------------------
+# SHARDING CONFIG
+# -----------------------
+# Larger quizzes are generated as concurrent shards of at most this many questions
+QUIZ_SHARD_SIZE = int(os.getenv("QUIZ_SHARD_SIZE", 10))
+QUIZ_MAX_COUNT = int(os.getenv("QUIZ_MAX_COUNT", 50))
+
+QUESTION_FORMAT = """{{
+      "question": "string",
+      "options": [
+        {{"key": "A", "text": "Option text"}},
+        {{"key": "B", "text": "Option text"}},
+        {{"key": "C", "text": "Option text"}},
+        {{"key": "D", "text": "Option text"}}
+      ],
+      "answer": "C",
+      "explanation": "Why this answer is correct"
+    }}"""
+
+
+def build_quiz_prompt(
+    topic: str, count: int = 5, difficulty: str | None = None, shard: tuple | None = None, avoid: list | None = None
+):
+    level = f"{difficulty} " if difficulty else ""
+    # Each shard gets its own prompt, so concurrent shards have distinct cache and coalescing keys
+    # instead of all sharing one answer
+    shard_note = ""
+    if shard:
+        shard_note = (
+            f"This is set {shard[0]} of {shard[1]} for the same quiz; "
+            "cover different subtopics from the other sets and do not repeat common questions.\n"
+        )
+    if avoid:
+        shard_note += "Do not repeat these existing questions:\n" + "".join(f"- {text}\n" for text in avoid)
+    return f"""
+Generate {count} {level}MCQs on {topic}.
+{shard_note}Return ONLY valid JSON without trailing commas.
+
+FORMAT:
+{{
+  "questions": [
+    {QUESTION_FORMAT.format()}
+  ]
+}}
+
+IMPORTANT: Do not include trailing commas in the JSON.
+"""
+
+
+def build_packed_quiz_prompt(topics: list[str], count: int = 5, difficulty: str | None = None):
+    level = f"{difficulty} " if difficulty else ""
+    return f"""
+Generate {count} {level}MCQs for EACH of these topics: {"; ".join(topics)}
+Return ONLY valid JSON without trailing commas.
+
+FORMAT:
+{{
+  "quizzes": [
+    {{
+      "topic": "topic name exactly as given",
+      "questions": [
+        {QUESTION_FORMAT.format()}
+      ]
+    }}
+  ]
+}}
+
+IMPORTANT: Do not include trailing commas in the JSON.
+"""
+
+
+def normalize_question(text: str) -> str:
+    # Ignore case, punctuation and spacing when comparing questions
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def merge_questions(shard_questions: list[list], count: int):
+    """Concatenate shard results in order, drop repeated questions and trim to count."""
+    seen = set()
+    merged = []
+    for questions in shard_questions:
+        for question in questions:
+            if not isinstance(question, dict) or "question" not in question:
+                continue
+            key = normalize_question(str(question["question"]))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(question)
+    return merged[:count]
+
+
+def split_shards(count: int):
+    """Split count into near-equal shard sizes no larger than QUIZ_SHARD_SIZE."""
+    shard_count = -(-count // QUIZ_SHARD_SIZE)
+    base, extra = divmod(count, shard_count)
+    return [base + (1 if index < extra else 0) for index in range(shard_count)]
+
+
+async def _generate_shard(topic, count, difficulty, shard=None, avoid=None, use_cache=True):
+    # Prompts with an avoid list top up the question bank; a cached answer to the same list
+    # would only return questions the bank already holds
+    raw = await generate_text_async(
+        build_quiz_prompt(topic, count, difficulty, shard, avoid), route="quiz", use_cache=use_cache and not avoid
+    )
+    try:
+        return extract_json(raw, allow_partial=True).get("questions", [])
+    except JSONExtractionError as e:
+        print(f"JSON Parse Error: {e}")
+        return []
+
+
+async def generate_quiz(topic: str, count: int = 5, difficulty: str | None = None, avoid: list | None = None):
+    """
+    Generate count MCQs. Up to QUIZ_SHARD_SIZE questions come from one prompt;
+    more are split into concurrent shards, merged and de-duplicated, with one
+    top-up shard if duplicates left the quiz short. avoid lists questions the
+    caller already has.
+    """
+    if count <= QUIZ_SHARD_SIZE:
+        return {"questions": await _generate_shard(topic, count, difficulty, avoid=avoid)}
+
+    sizes = split_shards(count)
+    shard_questions = await asyncio.gather(*[
+        _generate_shard(topic, size, difficulty, (index + 1, len(sizes)), avoid)
+        for index, size in enumerate(sizes)
+    ])
+    questions = merge_questions(shard_questions, count)
+
+    missing = count - len(questions)
+    if missing > 0:
+        # Never cached: it only runs because de-duplication left the quiz short
+        extra = await _generate_shard(
+            topic, min(missing, QUIZ_SHARD_SIZE), difficulty, (len(sizes) + 1, len(sizes) + 1), avoid,
+            use_cache=False,
+        )
+        questions = merge_questions([questions, extra], count)
+    return {"questions": questions}
+
+
+async def stream_quiz(topic: str, count: int = 5, difficulty: str | None = None):
+    """Yield de-duplicated MCQs from all shards as soon as each one is complete."""
+    sizes = [count] if count <= QUIZ_SHARD_SIZE else split_shards(count)
+    queue = asyncio.Queue()
+
+    async def run_shard(index, size):
+        shard = (index + 1, len(sizes)) if len(sizes) > 1 else None
+        parser = IncrementalArrayParser()
+        try:
+            async for chunk in stream_text_async(
+                build_quiz_prompt(topic, size, difficulty, shard), route="quiz", use_cache=True
+            ):
+                for question in parser.feed(chunk):
+                    await queue.put(question)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(run_shard(index, size)) for index, size in enumerate(sizes)]
+    seen = set()
+    sent = 0
+    running = len(tasks)
+    error = None
+    try:
+        while running and sent < count:
+            item = await queue.get()
+            if item is None:
+                running -= 1
+            elif isinstance(item, Exception):
+                error = error or item
+            elif isinstance(item, dict) and "question" in item:
+                key = normalize_question(str(item["question"]))
+                if key not in seen:
+                    seen.add(key)
+                    sent += 1
+                    yield item
+        # Only surface a shard failure when nothing at all came through
+        if error and not sent:
+            raise error
+    finally:
+        for task in tasks:
+            task.cancel()
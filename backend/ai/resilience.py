@@ -0,0 +1,230 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------
+# RESILIENCE CONFIG
+# -----------------------
+# Total time (seconds) a route may spend on one generation, retries and hedges included
+DEFAULT_BUDGETS = {"explain": 20, "resources": 20, "quiz": 30, "plan": 60}
+DEFAULT_BUDGET_SECONDS = float(os.getenv("LLM_BUDGET_SECONDS", 30))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 4))
+HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+# Hedge delay used until a route has enough latency samples for a p95
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", 5))
+HEDGE_MIN_SAMPLES = 20
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the upstream model is unhealthy or a route's latency budget is spent."""
+
+    status_code = 503
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    status_code = 504
+
+
+def get_budget(route: str):
+    default = DEFAULT_BUDGETS.get(route, DEFAULT_BUDGET_SECONDS)
+    return float(os.getenv(f"LLM_BUDGET_{route.upper()}", default))
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls flow; BREAKER_FAILURE_THRESHOLD consecutive failures open it
+    open      -> calls fail fast for BREAKER_RESET_SECONDS
+    half_open -> one trial call; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    def allow(self):
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                self.rejected_calls += 1
+                return False
+            self.state = "half_open"
+            self.trial_in_flight = False
+
+        if self.state == "half_open":
+            if self.trial_in_flight:
+                self.rejected_calls += 1
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def cancel_trial(self):
+        # The trial call ended without reaching the upstream (e.g. cancelled)
+        self.trial_in_flight = False
+
+    def is_open(self):
+        return self.state == "open"
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def get_stats(self):
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(max(self.reset_seconds - (time.monotonic() - self.opened_at), 0), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+            "retry_in_seconds": retry_in,
+        }
+
+
+class LatencyTracker:
+    """Recent successful call latencies per route, used to pick the hedge delay."""
+
+    def __init__(self, max_samples: int = 200):
+        self.samples = {}
+        self.max_samples = max_samples
+
+    def record(self, route: str, seconds: float):
+        self.samples.setdefault(route, deque(maxlen=self.max_samples)).append(seconds)
+
+    def p95(self, route: str):
+        samples = self.samples.get(route)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def hedge_delay(self, route: str):
+        return self.p95(route) or HEDGE_DEFAULT_DELAY
+
+    def get_stats(self):
+        return {
+            route: {"samples": len(samples), "p95_seconds": round(self.p95(route), 3) if self.p95(route) else None}
+            for route, samples in self.samples.items()
+        }
+
+
+breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+latency = LatencyTracker()
+_counters = {"retries": 0, "hedges": 0, "hedge_wins": 0, "budget_timeouts": 0}
+
+
+async def _timed_attempt(route: str, attempt_fn):
+    started = time.monotonic()
+    result = await attempt_fn()
+    latency.record(route, time.monotonic() - started)
+    return result
+
+
+async def _hedged_call(route: str, attempt_fn, can_hedge):
+    """
+    Start one attempt; if it is still running after the route's p95 latency and
+    a call slot is free, start a duplicate and take whichever finishes first.
+    """
+    first = asyncio.ensure_future(_timed_attempt(route, attempt_fn))
+    tasks = {first}
+    try:
+        if HEDGE_ENABLED:
+            done, _ = await asyncio.wait(tasks, timeout=latency.hedge_delay(route))
+            if not done and can_hedge():
+                _counters["hedges"] += 1
+                tasks.add(asyncio.ensure_future(_timed_attempt(route, attempt_fn)))
+
+        pending = set(tasks)
+        last_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        _counters["hedge_wins"] += 1
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def call_with_resilience(route: str, attempt_fn, can_hedge, local_errors=()):
+    """
+    Run attempt_fn under the route's latency budget with hedging, bounded
+    retries (exponential backoff with full jitter) and the circuit breaker.
+    Errors listed in local_errors (e.g. our own queue being full) are re-raised
+    as-is and do not count as upstream failures.
+    """
+    if not breaker.allow():
+        raise LLMUnavailableError("AI service is temporarily unavailable")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + get_budget(route)
+    last_error = None
+
+    for attempt in range(MAX_RETRIES + 1):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            result = await asyncio.wait_for(_hedged_call(route, attempt_fn, can_hedge), timeout=remaining)
+            breaker.record_success()
+            return result
+        except local_errors:
+            breaker.cancel_trial()
+            raise
+        except asyncio.CancelledError:
+            breaker.cancel_trial()
+            raise
+        except Exception as e:
+            last_error = e
+            breaker.record_failure()
+            print(f"⚠️ LLM call failed for route '{route}' (attempt {attempt + 1}): {e!r}")
+
+        if breaker.is_open() or attempt == MAX_RETRIES:
+            break
+        backoff = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if loop.time() + backoff >= deadline:
+            break
+        _counters["retries"] += 1
+        await asyncio.sleep(backoff)
+
+    if isinstance(last_error, asyncio.TimeoutError) or last_error is None:
+        _counters["budget_timeouts"] += 1
+        raise LLMTimeoutError(f"AI response exceeded the {route} latency budget")
+    raise LLMUnavailableError("AI service failed to respond") from last_error
+
+
+def get_resilience_stats():
+    return {
+        "breaker": breaker.get_stats(),
+        "latency": latency.get_stats(),
+        "counters": dict(_counters),
+    }
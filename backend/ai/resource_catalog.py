@@ -0,0 +1,176 @@
+import os
+import re
+import asyncio
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.session import with_session
+from models.resource_catalog import ResourceCatalog
+from utils.topics import canonical_topic
+
+load_dotenv()
+
+# -----------------------
+# RESOURCE CATALOG CONFIG
+# -----------------------
+RESOURCE_CATALOG_ENABLED = os.getenv("RESOURCE_CATALOG_ENABLED", "true").lower() == "true"
+# Catalog entries older than this are regenerated (in the background while the old one is served)
+RESOURCE_CATALOG_TTL_DAYS = float(os.getenv("RESOURCE_CATALOG_TTL_DAYS", 30))
+
+RESOURCE_TYPES = {
+    "youtube": "video",
+    "video": "video",
+    "videos": "video",
+    "article": "article",
+    "articles": "article",
+    "blog": "article",
+    "blogs": "article",
+    "docs": "docs",
+    "documentation": "docs",
+    "book": "book",
+    "books": "book",
+    "course": "course",
+    "courses": "course",
+}
+URL_PATTERN = re.compile(r"https?://[^\s)\]>]+")
+ITEM_PATTERN = re.compile(r"^(?:[-*•]|\d+[.)])\s*")
+
+_refreshing = set()
+_refresh_tasks = set()  # keep references so refresh tasks are not garbage-collected mid-run
+_stats = {"catalog_hits": 0, "stale_served": 0, "generated": 0, "refreshes": 0}
+
+
+def parse_resources(text: str):
+    """Turn the model's "Header:" / "- title – description" text into structured entries."""
+    entries = []
+    category = "General"
+    for line in text.splitlines():
+        clean = line.strip().replace("**", "").strip("# ").strip()
+        if not clean:
+            continue
+        if clean.endswith(":") and not ITEM_PATTERN.match(clean):
+            category = clean[:-1].strip()
+            continue
+        if not ITEM_PATTERN.match(clean):
+            continue
+
+        content = ITEM_PATTERN.sub("", clean, count=1).strip()
+        url_match = URL_PATTERN.search(content)
+        url = url_match.group(0).rstrip(".,") if url_match else None
+        if url_match:
+            content = (content[:url_match.start()] + content[url_match.end():]).strip(" -–—:()")
+
+        title, description = content, ""
+        for separator in (" – ", " — ", " - ", ": "):
+            if separator in content:
+                title, description = content.split(separator, 1)
+                break
+        title = title.strip().strip('"')
+        if len(title) <= 2:
+            continue
+        entries.append({
+            "type": RESOURCE_TYPES.get(category.lower(), "other"),
+            "category": category,
+            "title": title,
+            "description": description.strip().rstrip(",;"),
+            "url": url,
+        })
+    return entries
+
+
+def catalog_keys(subject: str, topic: str | None):
+    return canonical_topic(subject), canonical_topic(topic or "")
+
+
+def is_stale(entry: dict):
+    return datetime.utcnow() - entry["generated_at"] > timedelta(days=RESOURCE_CATALOG_TTL_DAYS)
+
+
+def get_catalog_entry(db: Session, subject: str, topic: str | None):
+    subject_key, topic_key = catalog_keys(subject, topic)
+    row = db.query(ResourceCatalog).filter(
+        ResourceCatalog.subject_key == subject_key,
+        ResourceCatalog.topic_key == topic_key,
+    ).first()
+    if not row:
+        return None
+    return {"resources": row.raw_text, "entries": row.entries, "generated_at": row.generated_at}
+
+
+def save_catalog_entry(db: Session, subject: str, topic: str | None, raw_text: str):
+    """Insert or refresh the catalog row for (subject, topic); safe against concurrent writers."""
+    subject_key, topic_key = catalog_keys(subject, topic)
+    entries = parse_resources(raw_text)
+    values = {"entries": entries, "raw_text": raw_text, "generated_at": datetime.utcnow()}
+
+    for _ in range(2):
+        row = db.query(ResourceCatalog).filter(
+            ResourceCatalog.subject_key == subject_key,
+            ResourceCatalog.topic_key == topic_key,
+        ).first()
+        if row:
+            for key, value in values.items():
+                setattr(row, key, value)
+        else:
+            db.add(ResourceCatalog(
+                subject_key=subject_key, topic_key=topic_key, subject=subject.strip(), topic=topic, **values
+            ))
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            # Another request created the row first; update it instead
+            db.rollback()
+    return {"resources": raw_text, "entries": entries}
+
+
+async def get_resources(subject: str, topic: str | None, generate):
+    """
+    Serve resources for (subject, topic) from the catalog. generate() is an
+    async fn returning the model's text and is only called when there is no
+    entry yet; stale entries are served as-is and refreshed in the background.
+    """
+    if not RESOURCE_CATALOG_ENABLED:
+        raw_text = await generate()
+        return {"resources": raw_text, "entries": parse_resources(raw_text)}
+
+    entry = await run_in_threadpool(with_session, get_catalog_entry, subject, topic)
+    if entry:
+        if is_stale(entry):
+            _stats["stale_served"] += 1
+            schedule_refresh(subject, topic, generate)
+        else:
+            _stats["catalog_hits"] += 1
+        return {"resources": entry["resources"], "entries": entry["entries"]}
+
+    _stats["generated"] += 1
+    raw_text = await generate()
+    return await run_in_threadpool(with_session, save_catalog_entry, subject, topic, raw_text)
+
+
+def schedule_refresh(subject: str, topic: str | None, generate):
+    key = catalog_keys(subject, topic)
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+
+    async def refresh():
+        try:
+            raw_text = await generate()
+            await run_in_threadpool(with_session, save_catalog_entry, subject, topic, raw_text)
+            _stats["refreshes"] += 1
+        except Exception as e:
+            print(f"⚠️ Resource catalog refresh failed for {key}: {e!r}")
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def get_catalog_stats():
+    return {"enabled": RESOURCE_CATALOG_ENABLED, "refreshing": len(_refreshing), **_stats}
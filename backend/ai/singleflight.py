@@ -0,0 +1,47 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work, later callers with the same key await the same result instead of
+    starting their own.
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> {"task": asyncio.Task, "waiters": int}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn, timeout: float):
+        call = self.calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(fn())
+            call = {"task": task, "waiters": 0}
+            self.calls[key] = call
+            self.started += 1
+            task.add_done_callback(lambda t, c=call: self._finish(key, c, t))
+        else:
+            self.coalesced += 1
+
+        call["waiters"] += 1
+        try:
+            # shield() so one waiter timing out does not cancel the shared call
+            return await asyncio.wait_for(asyncio.shield(call["task"]), timeout=timeout)
+        finally:
+            call["waiters"] -= 1
+
+    def _finish(self, key: str, call: dict, task: asyncio.Task):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+        # Mark the exception as retrieved even if every waiter already gave up
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self):
+        return {
+            "in_flight_keys": len(self.calls),
+            "waiters": {key[:12]: call["waiters"] for key, call in self.calls.items()},
+            "upstream_calls": self.started,
+            "coalesced_calls": self.coalesced,
+        }
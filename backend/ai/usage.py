@@ -0,0 +1,138 @@
+import os
+import bisect
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------
+# USAGE ACCOUNTING CONFIG
+# -----------------------
+USAGE_ENABLED = os.getenv("LLM_USAGE_ENABLED", "true").lower() == "true"
+# Days of per-user totals kept in memory
+USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", 7))
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60]  # seconds, upper bounds
+TOKEN_BUCKETS = [64, 128, 256, 512, 1024, 2048, 4096, 8192]  # completion tokens, upper bounds
+
+# Who the current request is for; set per request by middleware and per job by the job queue
+current_user_id: ContextVar[int | None] = ContextVar("current_user_id", default=None)
+# Optional one-item list that record() adds spent tokens to, for callers metering their own work
+token_meter: ContextVar[list | None] = ContextVar("token_meter", default=None)
+
+
+def _bucket_labels(bounds, unit=""):
+    return [f"<={bound}{unit}" for bound in bounds] + [f">{bounds[-1]}{unit}"]
+
+
+class UsageTracker:
+    """
+    In-memory accounting of every model request: fixed-bucket histograms and
+    counters per route, plus per-user daily totals. Recording is a few dict
+    updates under a lock, so it stays on in production.
+    """
+
+    def __init__(self, retention_days: int):
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.users = {}  # "YYYY-MM-DD" -> user id -> totals
+
+    def _route(self, route: str):
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_seconds": 0.0,
+                "cache": {},
+                "errors": {},
+                "latency_histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+                "completion_token_histogram": [0] * (len(TOKEN_BUCKETS) + 1),
+            }
+        return stats
+
+    def _prune(self):
+        oldest = (datetime.utcnow() - timedelta(days=self.retention_days - 1)).strftime("%Y-%m-%d")
+        for day in [day for day in self.users if day < oldest]:
+            del self.users[day]
+
+    def record(
+        self,
+        route: str,
+        seconds: float,
+        cache: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        error: str | None = None,
+        user_id: int | None = None,
+    ):
+        """
+        cache is the request's cache outcome: hit, stale, coalesced (shared
+        another caller's upstream call), miss (called the model) or bypass
+        (caching not used). error is the exception class name, if any.
+        """
+        if not USAGE_ENABLED:
+            return
+        if user_id is None:
+            user_id = current_user_id.get()
+        meter = token_meter.get()
+        if meter is not None:
+            meter[0] += prompt_tokens + completion_tokens
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+
+        with self.lock:
+            stats = self._route(route)
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["total_seconds"] += seconds
+            stats["cache"][cache] = stats["cache"].get(cache, 0) + 1
+            if error:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+            stats["latency_histogram"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if cache in ("miss", "bypass") and not error:
+                stats["completion_token_histogram"][bisect.bisect_left(TOKEN_BUCKETS, completion_tokens)] += 1
+
+            if today not in self.users:
+                self.users[today] = {}
+                self._prune()
+            totals = self.users[today].setdefault(
+                user_id or 0, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0, "errors": 0}
+            )
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["seconds"] += seconds
+            totals["errors"] += 1 if error else 0
+
+    def get_stats(self, user_id: int | None = None):
+        with self.lock:
+            routes = {}
+            for route, stats in self.routes.items():
+                routes[route] = {
+                    "calls": stats["calls"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "avg_seconds": round(stats["total_seconds"] / stats["calls"], 3) if stats["calls"] else None,
+                    "cache": dict(stats["cache"]),
+                    "errors": dict(stats["errors"]),
+                    "latency_histogram": dict(zip(_bucket_labels(LATENCY_BUCKETS, "s"), stats["latency_histogram"])),
+                    "completion_token_histogram": dict(
+                        zip(_bucket_labels(TOKEN_BUCKETS), stats["completion_token_histogram"])
+                    ),
+                }
+            users = {
+                day: {
+                    uid: {**totals, "seconds": round(totals["seconds"], 3)}
+                    for uid, totals in day_users.items()
+                    if user_id is None or uid == user_id
+                }
+                for day, day_users in sorted(self.users.items())
+            }
+        return {"enabled": USAGE_ENABLED, "routes": routes, "users_by_day": users}
+
+
+usage = UsageTracker(USAGE_RETENTION_DAYS)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: legacy regex JSON extraction vs utils.json_extract
+Run: python bench_json_extract.py [days]
+"""
+
+import json
+import re
+import sys
+import timeit
+
+from utils.json_extract import extract_json, TRAILING_COMMA_RETRIES
+
+
+def legacy_extract(raw):
+    # The approach previously copy-pasted in routes/quiz.py and routes/study_plan.py
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    if not match:
+        return None
+    json_str = match.group()
+    json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+    json_str = re.sub(r'\n\s*', ' ', json_str)
+    return json.loads(json_str)
+
+
+def make_plan_output(days, defects=True):
+    plan = {
+        "days": [
+            {
+                "day": day,
+                "topic": f"Topic {day}: core concepts and worked examples",
+                "tasks": [f"Task {n} for day {day} with some descriptive text" for n in range(1, 6)],
+            }
+            for day in range(1, days + 1)
+        ]
+    }
+    body = json.dumps(plan, indent=2)
+    if defects == "curly quotes":
+        # Curly quotes around one value need the full repair pass
+        body = body.replace('"Topic 1:', '“Topic 1:', 1).replace('examples",', 'examples”,', 1)
+    elif defects:
+        # Typical model defect: a trailing comma
+        body = body[:body.rindex("]")] + ",\n  ]\n}"
+    return f"Here is your plan:\n```json\n{body}\n```\nGood luck!"
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    for label, defects in [("well-formed", False), ("trailing comma", True), ("curly quotes", "curly quotes")]:
+        raw = make_plan_output(days, defects=defects)
+        try:
+            legacy_ok = legacy_extract(raw) == extract_json(raw)
+        except json.JSONDecodeError:
+            legacy_ok = False
+        assert legacy_ok or defects == "curly quotes", "extractors disagree"
+
+        print(f"📏 {label}: {days}-day plan, {len(raw):,} chars")
+        for name, fn in [("legacy regex", legacy_extract), ("json_extract", extract_json)]:
+            if name == "legacy regex" and not legacy_ok:
+                print(f"  {name:<14} :    cannot parse")
+                continue
+            runs = 200
+            best = min(timeit.repeat(lambda: fn(raw), number=runs, repeat=5)) / runs
+            print(f"  {name:<14} : {best * 1e6:>9.1f} µs per call")
+    print(
+        f"ℹ️  Up to {TRAILING_COMMA_RETRIES} trailing commas are dropped by re-running the C decoder. Curly quotes,\n"
+        "   truncation and more trailing commas take the Python repair pass, which is slower than\n"
+        "   the legacy regex; the first two are answers the legacy code could not parse at all"
+    )
+
+    raw = make_plan_output(days)
+    truncated = raw[: len(raw) * 2 // 3]
+    try:
+        legacy_extract(truncated)
+        legacy_days = "parsed"
+    except (json.JSONDecodeError, TypeError):
+        legacy_days = "failed"
+    partial = extract_json(truncated, allow_partial=True)
+    print(f"✂️  Truncated output: legacy {legacy_days}, json_extract recovered {len(partial['days'])} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: list-endpoint queries before and after the (user_id, created_at DESC)
+indexes. Seeds users, study plans and saved content into an EMPTY scratch
+database, drops the composite indexes, prints each query's plan and timing,
+builds the indexes with migrate_indexes and measures again.
+Run: python bench_list_queries.py [--database-url URL] [--users 100] [--rows-per-user 200]
+"""
+
+import os
+import random
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, text, tuple_, func
+
+from database.base import Base
+from migrate_indexes import migrate
+from models.user import User
+from models.study_plan import StudyPlan
+from models.saved_content import SavedQuiz, SavedResource, SavedExplanation, UserNote
+
+# (model, sort column) for each paginated list endpoint
+LIST_QUERIES = [
+    (StudyPlan, "created_at"),
+    (SavedQuiz, "created_at"),
+    (SavedResource, "created_at"),
+    (SavedExplanation, "created_at"),
+    (UserNote, "created_at"),
+]
+PAGE_SIZE = 20
+RUNS = 30
+
+
+def seed(engine, users: int, rows_per_user: int):
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+
+    def timestamp():
+        return start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": uid, "email": f"bench{uid}@example.com", "hashed_password": "x"} for uid in range(1, users + 1)
+        ])
+        for model, _ in LIST_QUERIES:
+            rows = []
+            for uid in range(1, users + 1):
+                for n in range(rows_per_user):
+                    rows.append(sample_row(model, uid, n, timestamp()))
+            conn.execute(model.__table__.insert(), rows)
+            print(f"🌱 {model.__tablename__}: {len(rows):,} rows")
+        conn.execute(text("ANALYZE"))
+
+
+def sample_row(model, uid: int, n: int, created: datetime):
+    base = {"user_id": uid, "created_at": created}
+    if model is StudyPlan:
+        days = [{"day": d, "topic": f"Topic {d}", "tasks": ["Read", "Practice"]} for d in range(1, 15)]
+        return {**base, "subject": f"Subject {n}", "weak_areas": "", "deadline_days": 14,
+                "plan_data": {"days": days}, "total_days": 14, "topic_summary": "Topic 1, Topic 2"}
+    if model is SavedQuiz:
+        return {**base, "topic": f"Topic {n}", "questions": {"questions": []}, "score": 3, "total_questions": 5}
+    if model is SavedResource:
+        return {**base, "title": f"Resource {n}", "url": "https://example.com", "description": "", "category": "General"}
+    if model is SavedExplanation:
+        return {**base, "topic": f"Topic {n}", "question": f"Question {n}?", "explanation": "Because."}
+    return {**base, "updated_at": created, "title": f"Note {n}", "content": "Text", "category": "General"}
+
+
+def page_queries(engine, model, sort_name: str, user_id: int):
+    """The first page and a deep page (half-way through the user's history), as paginate() builds them."""
+    sort_column, id_column = getattr(model, sort_name), model.id
+    base = select(model).where(model.user_id == user_id)
+    ordered = base.order_by(sort_column.desc(), id_column.desc()).limit(PAGE_SIZE + 1)
+
+    with engine.connect() as conn:
+        total = conn.execute(select(func.count()).select_from(base.subquery())).scalar()
+        cursor = conn.execute(
+            select(sort_column, id_column).where(model.user_id == user_id)
+            .order_by(sort_column.desc(), id_column.desc()).offset(total // 2).limit(1)
+        ).first()
+    deep = base.where(tuple_(sort_column, id_column) < tuple_(*cursor)).order_by(
+        sort_column.desc(), id_column.desc()
+    ).limit(PAGE_SIZE + 1)
+    return [("first page", ordered), ("deep page", deep)]
+
+
+def query_plan(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")).fetchall()
+            return [row[0] for row in rows]
+        if engine.dialect.name == "sqlite":
+            rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+            return [row[-1] for row in rows]
+        return [str(row) for row in conn.execute(text(f"EXPLAIN {compiled}")).fetchall()]
+
+
+def time_query(engine, statement):
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            conn.execute(statement).fetchall()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def measure(engine, user_id: int):
+    results = {}
+    for model, sort_name in LIST_QUERIES:
+        for label, statement in page_queries(engine, model, sort_name, user_id):
+            results[(model.__tablename__, label)] = (time_query(engine, statement), query_plan(engine, statement))
+    return results
+
+
+def composite_indexes():
+    return [
+        index
+        for model, _ in LIST_QUERIES
+        for index in model.__table__.indexes
+        if len(index.expressions) > 1
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="Empty scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rows-per-user", type=int, default=200)
+    args = parser.parse_args()
+
+    path = None
+    if args.database_url:
+        url = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench_list_queries.db")
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("❌ The users table is not empty; point --database-url at an empty scratch database")
+
+    print(f"📦 Seeding {args.users} users x {args.rows_per_user} rows per list on {engine.dialect.name}")
+    seed(engine, args.users, args.rows_per_user)
+
+    indexes = composite_indexes()
+    with engine.begin() as conn:
+        for index in indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    user_id = args.users // 2 or 1
+    before = measure(engine, user_id)
+
+    print("\n🔧 Building indexes with migrate_indexes")
+    migrate(engine, tables={model.__tablename__ for model, _ in LIST_QUERIES})
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = measure(engine, user_id)
+
+    print(f"\n📏 Median of {RUNS} runs, user {user_id}, page size {PAGE_SIZE}")
+    print(f"  {'query':<40} {'before':>10} {'after':>10} {'speed-up':>9}")
+    for key, (before_ms, _) in before.items():
+        after_ms = after[key][0]
+        print(f"  {' / '.join(key):<40} {before_ms:>8.2f}ms {after_ms:>8.2f}ms {before_ms / after_ms:>8.1f}x")
+
+    print("\n🔎 Query plans (before -> after)")
+    for key, (_, plan_before) in before.items():
+        print(f"  {' / '.join(key)}")
+        for line in plan_before:
+            print(f"    before: {line}")
+        for line in after[key][1]:
+            print(f"    after:  {line}")
+
+    if path:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
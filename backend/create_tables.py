@@ -6,6 +6,10 @@ import models.study_plan
 import models.progress
 import models.plan_progress
 import models.saved_content
+import models.idempotency_key
+import models.question_bank
+import models.resource_catalog
+import models.plan_template
 
 Base.metadata.create_all(bind=engine)
 
@@ -11,6 +11,14 @@ print("🔥 DATABASE_URL USED BY FASTAPI:", DATABASE_URL)
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def with_session(fn, *args):
+    """Run fn(db, *args) in a fresh session; for work done outside a request (threadpool, jobs)."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
 def get_db():
     db = SessionLocal()
     try:
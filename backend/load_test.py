@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Simple concurrent load test for the AI endpoints.
+
+Start the API against the fake model so no quota is used:
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_MS=800 uvicorn main:app
+Then:
+    python load_test.py --requests 200 --concurrency 50 --endpoint explain
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = {
+    "explain": ("POST", "/explain/", lambda i, unique: {"question": f"recursion {i}" if unique else "recursion"}),
+    "resources": ("POST", "/resources/", lambda i, unique: {"subject": "Python", "topic": f"decorators {i}" if unique else "decorators"}),
+    "quiz": ("GET", "/quiz/generate?topic={topic}", None),
+    "root": ("GET", "/", None),
+}
+
+
+def send(base_url, endpoint, index, unique):
+    method, path, body_fn = ENDPOINTS[endpoint]
+    path = path.format(topic=f"photosynthesis{index}" if unique else "photosynthesis")
+    data = json.dumps(body_fn(index, unique)).encode() if body_fn else None
+    request = urllib.request.Request(
+        base_url + path, data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            status = response.status
+            response.read()
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="explain")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--unique", action="store_true", help="Use a different prompt per request (defeats caching)")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.requests} x {args.endpoint} at concurrency {args.concurrency}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: send(args.base_url, args.endpoint, i, args.unique), range(args.requests)
+        ))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def pct(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    print(f"  Throughput : {len(results) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"  Latency    : p50 {pct(0.5):.0f} ms | p95 {pct(0.95):.0f} ms | max {latencies[-1] * 1000:.0f} ms")
+    print(f"  Statuses   : {statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from utils.dependencies import get_current_user
+from ai.gemini import LLMBusyError
+from ai.resilience import LLMUnavailableError
+from utils.jobs import job_queue
+from ai.usage import current_user_id
+from utils.security import user_id_from_token
+from ai.prewarm import prewarmer
 
 # 🔐 Auth
 from routes.auth import router as auth_router
@@ -13,6 +20,7 @@ from routes import explain
 from routes import resources
 from routes import notes
 from routes import saved_content
+from routes import ai_status
 from models import study_plan
 from models import plan_progress
 
@@ -32,6 +40,47 @@ app.add_middleware(
 )
 
 
+# ⚙️ Background job workers and topic pre-warming
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.start()
+    prewarmer.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_queue.stop()
+    await prewarmer.stop()
+
+
+# 📊 Attribute AI usage to the signed-in user (token decode only, no DB lookup)
+@app.middleware("http")
+async def track_usage_user(request: Request, call_next):
+    authorization = request.headers.get("authorization", "")
+    user_id = None
+    if authorization.lower().startswith("bearer "):
+        user_id = user_id_from_token(authorization[7:])
+    current_user_id.set(user_id)
+    return await call_next(request)
+
+
+# 🚦 AI backpressure -> 503 so clients can retry later
+@app.exception_handler(LLMBusyError)
+async def llm_busy_handler(request: Request, exc: LLMBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "5"},
+    )
+
+# 🩺 Upstream unhealthy (breaker open) or latency budget spent -> 503 / 504
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "10"},
+    )
+
 
 # 🚏 Routers (NO LOGIC CHANGED)
 app.include_router(study_router)
@@ -42,6 +91,7 @@ app.include_router(resources.router, tags=["Resources"])
 app.include_router(notes.router, tags=["Notes"])
 app.include_router(saved_content.router, prefix="/saved", tags=["Saved Content"])
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
+app.include_router(ai_status.router, tags=["AI Status"])
 
 
 # 🏠 Root
@@ -13,7 +13,7 @@ def create_plan_progress_table():
     CREATE TABLE IF NOT EXISTS plan_progress (
         id SERIAL PRIMARY KEY,
         user_id INTEGER NOT NULL REFERENCES users(id),
-        plan_id INTEGER NOT NULL REFERENCES study_plans(id),
+        plan_id INTEGER NOT NULL REFERENCES study_plans(id) ON DELETE CASCADE,
         total_days INTEGER DEFAULT 0,
         completed_days INTEGER DEFAULT 0,
         completed_day_numbers TEXT DEFAULT '',
@@ -22,7 +22,7 @@ def create_plan_progress_table():
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     
-    CREATE INDEX IF NOT EXISTS idx_plan_progress_user_plan ON plan_progress(user_id, plan_id);
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_plan_progress_user_plan ON plan_progress(user_id, plan_id);
     """
     
     try:
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Build the indexes declared on the models that an existing database is missing,
+without blocking writes. On Postgres each index is built with
+CREATE INDEX CONCURRENTLY and its progress is read from
+pg_stat_progress_create_index; other databases get a plain CREATE INDEX.
+Run: python migrate_indexes.py [--dry-run] [--table study_plans ...]
+"""
+
+import re
+import time
+import argparse
+import threading
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from database.base import Base
+
+# Import models to ensure they're registered
+import models.user
+import models.study_plan
+import models.progress
+import models.plan_progress
+import models.user_progress
+import models.saved_content
+import models.idempotency_key
+import models.question_bank
+import models.resource_catalog
+import models.plan_template
+
+PROGRESS_INTERVAL_SECONDS = 2
+
+
+def index_ddl(index, dialect, concurrently: bool):
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    if concurrently:
+        ddl = re.sub(r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl)
+    return ddl
+
+
+def invalid_indexes(engine):
+    """Indexes left unusable by an interrupted CREATE INDEX CONCURRENTLY (Postgres only)."""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+        ))
+        return {row[0] for row in rows}
+
+
+def existing_index_names(engine, inspector, table: str):
+    # SQLAlchemy does not reflect SQLite expression indexes (e.g. coalesce(...)), so read them from sqlite_master
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {"table": table}
+            )
+            return {row[0] for row in rows}
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def missing_indexes(engine, tables=None):
+    """(index, rebuild) for every model index the database lacks; rebuild means an invalid copy must be dropped first."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    invalid = invalid_indexes(engine) if engine.dialect.name == "postgresql" else set()
+
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if tables and table.name not in tables:
+            continue
+        if table.name not in existing_tables:
+            print(f"⚠️  {table.name} does not exist yet; run python create_tables.py")
+            continue
+        existing = existing_index_names(engine, inspector, table.name)
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in invalid:
+                missing.append((index, True))
+            elif index.name not in existing:
+                missing.append((index, False))
+    return missing
+
+
+def report_progress(engine, table: str, index_name: str, stop: threading.Event):
+    """Print pg_stat_progress_create_index for the build until stop is set."""
+    with engine.connect() as conn:
+        while not stop.wait(PROGRESS_INTERVAL_SECONDS):
+            row = conn.execute(text(
+                "SELECT p.phase, p.blocks_done, p.blocks_total, p.tuples_done, p.tuples_total "
+                "FROM pg_stat_progress_create_index p "
+                "JOIN pg_class c ON c.oid = p.relid "
+                "WHERE c.relname = :table"
+            ), {"table": table}).first()
+            conn.rollback()
+            if not row:
+                continue
+            phase, blocks_done, blocks_total, tuples_done, tuples_total = row
+            if blocks_total:
+                detail = f"{blocks_done / blocks_total:.0%} of {blocks_total:,} blocks"
+            elif tuples_total:
+                detail = f"{tuples_done / tuples_total:.0%} of {tuples_total:,} rows"
+            else:
+                detail = ""
+            print(f"   ⏳ {index_name}: {phase} {detail}".rstrip())
+
+
+def build_index(engine, index, rebuild: bool = False):
+    concurrently = engine.dialect.name == "postgresql"
+    ddl = index_ddl(index, engine.dialect, concurrently)
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if rebuild:
+            print(f"🧹 Dropping invalid index {index.name}")
+            conn.execute(text(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {index.name}"))
+
+        stop = threading.Event()
+        reporter = None
+        if concurrently:
+            reporter = threading.Thread(
+                target=report_progress, args=(engine, index.table.name, index.name, stop), daemon=True
+            )
+            reporter.start()
+        started = time.perf_counter()
+        try:
+            conn.execute(text(ddl))
+        finally:
+            stop.set()
+            if reporter:
+                reporter.join()
+    return time.perf_counter() - started
+
+
+def migrate(engine, tables=None, dry_run: bool = False):
+    missing = missing_indexes(engine, tables)
+    if not missing:
+        print("✅ All model indexes already exist")
+        return []
+
+    print(f"📊 {len(missing)} index(es) to build on {engine.dialect.name}")
+    built = []
+    for number, (index, rebuild) in enumerate(missing, start=1):
+        ddl = index_ddl(index, engine.dialect, engine.dialect.name == "postgresql")
+        print(f"[{number}/{len(missing)}] {ddl}")
+        if dry_run:
+            continue
+        seconds = build_index(engine, index, rebuild)
+        print(f"  ✅ {index.name} built in {seconds:.2f}s")
+        built.append(index.name)
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing model indexes without locking tables")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the statements that would run")
+    parser.add_argument("--table", action="append", help="Limit to this table (repeatable)")
+    args = parser.parse_args()
+
+    from database.session import engine
+
+    print("🔄 Checking indexes...")
+    try:
+        migrate(engine, args.table, args.dry_run)
+    except Exception as e:
+        print(f"❌ Index migration failed: {e}")
+        raise
+    print("✅ Index migration completed" if not args.dry_run else "ℹ️  Dry run, nothing was changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 """
-Migration script to create the new plan_progress table and migrate existing data
+Migration script to create the plan_progress table and move the per-user
+JSON progress blobs in user_progress into one row per (user, plan)
 """
 
+import json
+
 from database.session import engine, get_db
 from database.base import Base
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, inspect, LargeBinary
+from sqlalchemy.orm import load_only
 
 # Import models to ensure they're registered
 import models.user
@@ -15,18 +18,37 @@ import models.progress
 import models.plan_progress
 import models.user_progress
 
+from utils.day_set import DaySet
+from utils.plan_progress import row_days
+
+def parse_progress_blob(completed_day_numbers_str):
+    """Old user_progress format: '{"plan_id": [1,2,3]}' (anything else is treated as empty)"""
+    try:
+        data = json.loads(completed_day_numbers_str or "{}")
+    except (json.JSONDecodeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
 def migrate():
     print("🔄 Starting migration...")
     
     # Create new tables
     Base.metadata.create_all(bind=engine)
+    # create_all does not alter a plan_progress table that already exists
+    columns = {column["name"] for column in inspect(engine).get_columns("plan_progress")}
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_plan_progress_user_plan ON plan_progress (user_id, plan_id)"
+        ))
+        if "completed_days_mask" not in columns:
+            mask_type = LargeBinary().compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE plan_progress ADD COLUMN completed_days_mask {mask_type}"))
     print("✅ New tables created")
     
     # Get database session
     db = next(get_db())
     
     try:
-        # Check if we need to migrate existing data
         from models.user_progress import UserProgress
         from models.study_plan import StudyPlan
         from models.plan_progress import PlanProgress
@@ -38,38 +60,68 @@ def migrate():
             print(f"📊 Found {len(existing_progress)} existing progress records")
             
             for user_prog in existing_progress:
-                # Get all study plans for this user
-                user_plans = db.query(StudyPlan).filter(StudyPlan.user_id == user_prog.user_id).all()
+                blob = parse_progress_blob(user_prog.completed_day_numbers)
+                # Only the columns every schema has, so this runs before migrate_study_plan_summary.py too
+                user_plans = (
+                    db.query(StudyPlan)
+                    .options(load_only(StudyPlan.id, StudyPlan.plan_data, StudyPlan.subject))
+                    .filter(StudyPlan.user_id == user_prog.user_id)
+                    .all()
+                )
                 
                 if user_plans:
                     print(f"👤 Migrating progress for user {user_prog.user_id} with {len(user_plans)} plans")
                     
-                    # Create plan-specific progress for each plan
                     for plan in user_plans:
-                        # Check if plan progress already exists
                         existing_plan_progress = db.query(PlanProgress).filter(
                             PlanProgress.user_id == user_prog.user_id,
                             PlanProgress.plan_id == plan.id
                         ).first()
                         
-                        if not existing_plan_progress:
-                            total_days = len(plan.plan_data.get("days", [])) if plan.plan_data else 0
-                            
-                            plan_progress = PlanProgress(
-                                user_id=user_prog.user_id,
-                                plan_id=plan.id,
-                                total_days=total_days,
-                                completed_days=0,  # Reset to 0 for clean start
-                                completed_day_numbers="",
-                                is_completed=False
+                        total_days = len(plan.plan_data.get("days", [])) if plan.plan_data else 0
+                        days = DaySet.from_days(
+                            int(day) for day in blob.get(str(plan.id), []) if str(day).isdigit() and int(day) >= 1
+                        )
+
+                        if existing_plan_progress:
+                            # Rows from an earlier run (or the first plan_progress migration) start
+                            # zeroed; the blob is the source of truth, so add its days to them
+                            days |= row_days(
+                                existing_plan_progress.completed_days_mask,
+                                existing_plan_progress.completed_day_numbers
                             )
-                            db.add(plan_progress)
-                            print(f"  ✅ Created progress for plan {plan.id} ({plan.subject})")
+                            existing_plan_progress.completed_days_mask = days.to_bytes()
+                            existing_plan_progress.completed_day_numbers = ""
+                            existing_plan_progress.completed_days = len(days)
+                            existing_plan_progress.is_completed = bool(total_days) and len(days) >= total_days
+                            print(f"  ✅ Merged plan {plan.id} ({plan.subject}): {len(days)}/{total_days} days")
+                            continue
+
+                        db.add(PlanProgress(
+                            user_id=user_prog.user_id,
+                            plan_id=plan.id,
+                            total_days=total_days,
+                            completed_days=len(days),
+                            completed_days_mask=days.to_bytes(),
+                            is_completed=bool(total_days) and len(days) >= total_days
+                        ))
+                        print(f"  ✅ Migrated plan {plan.id} ({plan.subject}): {len(days)}/{total_days} days")
             
             db.commit()
-            print("✅ Migration completed successfully")
         else:
-            print("ℹ️  No existing progress to migrate")
+            print("ℹ️  No existing user_progress to migrate")
+
+        # Rows written before completed_days_mask existed keep their days in the legacy list
+        legacy_rows = db.query(PlanProgress).filter(PlanProgress.completed_days_mask.is_(None)).all()
+        for row in legacy_rows:
+            days = row_days(None, row.completed_day_numbers)
+            row.completed_days_mask = days.to_bytes()
+            row.completed_days = len(days)
+            row.completed_day_numbers = ""
+        db.commit()
+        if legacy_rows:
+            print(f"✅ Converted {len(legacy_rows)} plan_progress rows to completed_days_mask")
+        print("✅ Migration completed successfully")
             
     except Exception as e:
         print(f"❌ Migration failed: {e}")
@@ -79,4 +131,4 @@ def migrate():
         db.close()
 
 if __name__ == "__main__":
-    migrate()
\ No newline at end of file
+    migrate()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the total_days and topic_summary columns to
+study_plans and fill them from plan_data for existing plans
+"""
+
+from sqlalchemy import text, inspect
+
+from database.session import engine, get_db
+
+# Import models to ensure they're registered
+import models.user
+import models.study_plan
+from models.study_plan import StudyPlan, summarize_plan
+
+BATCH_SIZE = 500
+
+def migrate():
+    print("🔄 Starting migration...")
+
+    columns = {column["name"] for column in inspect(engine).get_columns("study_plans")}
+    with engine.begin() as conn:
+        if "total_days" not in columns:
+            conn.execute(text("ALTER TABLE study_plans ADD COLUMN total_days INTEGER"))
+        if "topic_summary" not in columns:
+            conn.execute(text("ALTER TABLE study_plans ADD COLUMN topic_summary VARCHAR"))
+    print("✅ Columns added")
+
+    db = next(get_db())
+
+    try:
+        updated = 0
+        while True:
+            plans = (
+                db.query(StudyPlan)
+                .filter(StudyPlan.total_days.is_(None))
+                .order_by(StudyPlan.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not plans:
+                break
+            for plan in plans:
+                for key, value in summarize_plan(plan.plan_data).items():
+                    setattr(plan, key, value)
+            db.commit()
+            updated += len(plans)
+            print(f"  ✅ Filled {updated} plans")
+
+        print(f"✅ Migration completed successfully ({updated} plans updated)")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate()
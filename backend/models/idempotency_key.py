@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from datetime import datetime
+from database.base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    key = Column(String, nullable=False)
+    endpoint = Column(String, nullable=False)
+    request_hash = Column(String)  # sha256 of the canonical request body
+    status = Column(String, nullable=False, default="in_progress")  # in_progress / done
+    response = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
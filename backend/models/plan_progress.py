@@ -1,21 +1,25 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, Boolean, DateTime, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database.base import Base
 
 class PlanProgress(Base):
     __tablename__ = "plan_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "plan_id", name="uq_plan_progress_user_plan"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    plan_id = Column(Integer, ForeignKey("study_plans.id"), nullable=False)
+    plan_id = Column(Integer, ForeignKey("study_plans.id", ondelete="CASCADE"), nullable=False)
     total_days = Column(Integer, default=0)
     completed_days = Column(Integer, default=0)
-    completed_day_numbers = Column(String, default="")  # Store as comma-separated: "1,3,5"
+    completed_day_numbers = Column(String, default="")  # Legacy comma-separated "1,3,5"; rows now use completed_days_mask
+    completed_days_mask = Column(LargeBinary)  # DaySet bytes: bit n - 1 set when day n is completed
     is_completed = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User")
-    study_plan = relationship("StudyPlan")
\ No newline at end of file
+    study_plan = relationship("StudyPlan")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint
+from datetime import datetime
+from database.base import Base
+
+class PlanTemplate(Base):
+    __tablename__ = "plan_templates"
+    __table_args__ = (
+        UniqueConstraint("subject_key", "total_days", name="uq_plan_template_subject_days"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject_key = Column(String, nullable=False)  # canonical_topic(subject)
+    total_days = Column(Integer, nullable=False)
+    subject = Column(String, nullable=False)
+    plan_data = Column(JSON, nullable=False)  # generic plan, no weak areas: {"days": [...]}
+    uses = Column(Integer, default=0)  # plans built from this template
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, UniqueConstraint, Index, func
+from datetime import datetime
+from database.base import Base
+
+class BankQuestion(Base):
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        Index("ix_question_bank_topic_difficulty", "topic_key", "difficulty"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic_key = Column(String, nullable=False)  # canonical_topic(topic)
+    topic = Column(String, nullable=False)
+    difficulty = Column(String)  # easy / medium / hard, None when not specified
+    question_hash = Column(String, nullable=False)  # hash of the normalized question text
+    question = Column(JSON, nullable=False)  # {"question", "options", "answer", "explanation"}
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# One copy of a question per (topic, difficulty); coalesce so unspecified difficulty (NULL) is deduplicated too
+Index(
+    "uq_question_bank_topic_difficulty_hash",
+    BankQuestion.topic_key,
+    func.coalesce(BankQuestion.difficulty, ""),
+    BankQuestion.question_hash,
+    unique=True,
+)
+
+class SeenQuestion(Base):
+    __tablename__ = "seen_questions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_seen_question_user"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("question_bank.id", ondelete="CASCADE"), nullable=False)
+    seen_at = Column(DateTime, default=datetime.utcnow)
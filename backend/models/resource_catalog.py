@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, UniqueConstraint
+from datetime import datetime
+from database.base import Base
+
+class ResourceCatalog(Base):
+    __tablename__ = "resource_catalog"
+    __table_args__ = (
+        UniqueConstraint("subject_key", "topic_key", name="uq_resource_catalog_subject_topic"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject_key = Column(String, nullable=False)  # canonical_topic(subject)
+    topic_key = Column(String, nullable=False, default="")  # canonical_topic(topic), "" for the whole subject
+    subject = Column(String, nullable=False)
+    topic = Column(String)
+    entries = Column(JSON, nullable=False)  # [{"type", "category", "title", "description", "url"}]
+    raw_text = Column(Text, nullable=False)  # model output the entries were parsed from
+    generated_at = Column(DateTime, default=datetime.utcnow)
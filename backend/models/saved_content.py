@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database.base import Base
@@ -56,4 +56,14 @@ class UserNote(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+# Newest-first per user, matching the list endpoints' keyset pagination
+Index("ix_saved_quizzes_user_created", SavedQuiz.user_id, SavedQuiz.created_at.desc(), SavedQuiz.id.desc())
+Index("ix_saved_resources_user_created", SavedResource.user_id, SavedResource.created_at.desc(), SavedResource.id.desc())
+Index(
+    "ix_saved_explanations_user_created",
+    SavedExplanation.user_id, SavedExplanation.created_at.desc(), SavedExplanation.id.desc(),
+)
+# Notes page on created_at too: updated_at changes on edit, which would move a note across pages mid-scroll
+Index("ix_user_notes_user_created", UserNote.user_id, UserNote.created_at.desc(), UserNote.id.desc())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from pydantic import BaseModel
@@ -15,11 +15,40 @@ class StudyPlan(Base):
     weak_areas = Column(String)
     deadline_days = Column(Integer)
     plan_data = Column(JSON)
+    # Written with plan_data so list endpoints never have to load and decode it
+    total_days = Column(Integer)
+    topic_summary = Column(String)
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="study_plans")
 
+# Newest-first per user, matching GET /study/plans keyset pagination
+Index("ix_study_plans_user_created", StudyPlan.user_id, StudyPlan.created_at.desc(), StudyPlan.id.desc())
+
+TOPIC_SUMMARY_MAX_LENGTH = 255
+
+def summarize_plan(plan_data: dict | None):
+    """total_days and topic_summary ("Cells, Genetics, ...") for a plan's plan_data."""
+    days = (plan_data or {}).get("days", [])
+    topics = []
+    for day in days:
+        topic = str(day.get("topic", "")).strip() if isinstance(day, dict) else ""
+        if topic and topic not in topics:
+            topics.append(topic)
+    summary = ", ".join(topics)
+    if len(summary) > TOPIC_SUMMARY_MAX_LENGTH:
+        summary = summary[:TOPIC_SUMMARY_MAX_LENGTH - 3].rsplit(", ", 1)[0] + "..."
+    return {"total_days": len(days), "topic_summary": summary}
+
+def plan_total_days(plan):
+    """The stored day count; plans saved before total_days existed fall back to plan_data."""
+    if plan is None:
+        return 0
+    if plan.total_days is not None:
+        return plan.total_days
+    return summarize_plan(plan.plan_data)["total_days"]
+
 class StudyPlanOut(BaseModel):
     id: int
     subject: str
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+
+from ai.gemini import get_llm_stats
+from ai.cache import response_cache
+from ai.resilience import get_resilience_stats
+from ai.question_bank import get_bank_stats
+from ai.prewarm import prewarmer
+from ai.question_index import explain_index
+from ai.resource_catalog import get_catalog_stats
+from ai.plan_templates import get_template_stats
+from ai.usage import usage
+from utils.jobs import job_queue
+from utils.dependencies import get_current_user, get_admin_user, is_admin
+
+router = APIRouter(prefix="/ai", tags=["AI Status"])
+
+@router.get("/stats")
+def get_ai_stats(admin=Depends(get_admin_user)):
+    return {
+        "llm": get_llm_stats(),
+        "cache": response_cache.get_stats(),
+        "resilience": get_resilience_stats(),
+        "jobs": job_queue.get_stats(),
+        "question_bank": get_bank_stats(),
+        "prewarm": prewarmer.get_stats(),
+        "explain_index": explain_index.get_stats(),
+        "resource_catalog": get_catalog_stats(),
+        "plan_templates": get_template_stats(),
+    }
+
+@router.get("/usage")
+def get_ai_usage(user_id: int | None = None, user=Depends(get_current_user)):
+    """
+    Admins get token, latency, cache and error accounting per route and every
+    user's daily totals (0 = anonymous), optionally filtered by user_id.
+    Everyone else only gets their own daily totals.
+    """
+    if is_admin(user):
+        return usage.get_stats(user_id)
+    stats = usage.get_stats(user.id)
+    return {"enabled": stats["enabled"], "users_by_day": stats["users_by_day"]}
+
+@router.get("/breaker")
+def get_breaker_state(admin=Depends(get_admin_user)):
+    return get_resilience_stats()["breaker"]
@@ -1,20 +1,81 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from ai.gemini import generate_text
+from ai.gemini import generate_text_async, stream_text_async, MODEL_NAME
+from ai.cache import response_cache, make_cache_key, CACHE_ENABLED
+from ai.prewarm import prewarmer
+from ai.question_index import explain_index, EXPLAIN_INDEX_ENABLED
+from utils.sse import stream_sse, single_chunk
+from utils.idempotency import run_idempotent
 
 router = APIRouter(prefix="/explain", tags=["AI Explain"])
 
 class ExplainRequest(BaseModel):
     question: str
 
-@router.post("/")
-def explain_topic(data: ExplainRequest):
-    prompt = f"""
+def find_similar_explanation(question: str):
+    # Reuse the answer to a near-identical earlier question instead of calling the model
+    if not EXPLAIN_INDEX_ENABLED:
+        return None
+    match = explain_index.lookup(question)
+    return match[1] if match else None
+
+def remember_explanation(question: str, explanation: str):
+    if EXPLAIN_INDEX_ENABLED:
+        explain_index.insert(question, explanation)
+
+async def stream_and_remember(question: str, chunks):
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    remember_explanation(question, "".join(parts))
+
+def build_explain_prompt(question: str):
+    return f"""
 Explain the following topic in very simple terms.
 Use easy language, an example, and an analogy.
 
-Topic: {data.question}
+Topic: {question}
 """
 
-    explanation = generate_text(prompt)
-    return {"explanation": explanation}
+async def warm_explanation(question: str):
+    """Pre-warm hook: cache the explanation for a popular question if it is not cached yet."""
+    prompt = build_explain_prompt(question)
+    if not CACHE_ENABLED or response_cache.contains(make_cache_key(prompt, MODEL_NAME)):
+        return False
+    explanation = await generate_text_async(prompt, route="prewarm", use_cache=True)
+    remember_explanation(question, explanation)
+    return True
+
+prewarmer.register("explain", warm_explanation)
+
+@router.post("/")
+async def explain_topic(data: ExplainRequest, idempotency_key: str | None = Header(default=None)):
+    prompt = build_explain_prompt(data.question)
+    prewarmer.record("explain", data.question)
+
+    async def explain():
+        explanation = find_similar_explanation(data.question)
+        if explanation is None:
+            explanation = await generate_text_async(prompt, route="explain", use_cache=True)
+            remember_explanation(data.question, explanation)
+        return {"explanation": explanation}
+
+    return await run_idempotent(idempotency_key, None, "POST /explain/", data, explain)
+
+@router.post("/stream")
+async def explain_topic_stream(data: ExplainRequest):
+    prompt = build_explain_prompt(data.question)
+    prewarmer.record("explain", data.question)
+
+    explanation = find_similar_explanation(data.question)
+    if explanation is not None:
+        chunks = single_chunk(explanation)
+    else:
+        chunks = stream_and_remember(data.question, stream_text_async(prompt, route="explain", use_cache=True))
+    return StreamingResponse(
+        stream_sse(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
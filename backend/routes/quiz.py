@@ -1,50 +1,192 @@
-from fastapi import APIRouter
-from ai.gemini import generate_text
-import json, re
+import os
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import List, Literal
+from ai.gemini import generate_text_async, LLMBusyError
+from ai.resilience import LLMUnavailableError
+from ai.quiz_generator import (
+    QUIZ_MAX_COUNT,
+    QUIZ_SHARD_SIZE,
+    build_packed_quiz_prompt,
+    stream_quiz,
+)
+from ai.question_bank import QUIZ_BANK_ENABLED, assemble_quiz, bank_generated, quiz_from_bank, warm_topic
+from ai.prewarm import prewarmer
+from models.user import User
+from utils.dependencies import get_optional_user
+from utils.json_extract import extract_json, JSONExtractionError
+from utils.idempotency import run_idempotent
+import json
 
 router = APIRouter()
 
+prewarmer.register("quiz", warm_topic)
+
+# How many quiz generations one batch request may run at once
+BATCH_CONCURRENCY = int(os.getenv("QUIZ_BATCH_CONCURRENCY", 4))
+BATCH_MAX_TOPICS = int(os.getenv("QUIZ_BATCH_MAX_TOPICS", 20))
+
+class QuizBatchRequest(BaseModel):
+    topics: List[str]
+    # Topics per prompt; 1 = one prompt per topic, >1 packs several topics into one call
+    pack_size: int = 1
+    stream: bool = True
+    count: int = 5
+    difficulty: Literal["easy", "medium", "hard"] | None = None
+
 @router.get("/generate")
-def generate_quiz(topic: str):
-    prompt = f"""
-Generate 5 MCQs on {topic}.
-Return ONLY valid JSON without trailing commas.
-
-FORMAT:
-{{
-  "questions": [
-    {{
-      "question": "string",
-      "options": [
-        {{"key": "A", "text": "Option text"}},
-        {{"key": "B", "text": "Option text"}},
-        {{"key": "C", "text": "Option text"}},
-        {{"key": "D", "text": "Option text"}}
-      ],
-      "answer": "C",
-      "explanation": "Why this answer is correct"
-    }}
-  ]
-}}
-
-IMPORTANT: Do not include trailing commas in the JSON.
-"""
-
-    raw = generate_text(prompt)
-
-    match = re.search(r"\{.*\}", raw, re.DOTALL)
-    if not match:
-        return {"questions": []}
-
-    json_str = match.group()
-    
-    # Clean up common JSON issues
-    json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)  # Remove trailing commas
-    json_str = re.sub(r'\n\s*', ' ', json_str)  # Remove extra whitespace
-    
+async def generate_quiz(
+    topic: str,
+    count: int = Query(5, ge=1, le=QUIZ_MAX_COUNT),
+    difficulty: Literal["easy", "medium", "hard"] | None = None,
+    current_user: User | None = Depends(get_optional_user),
+):
+    prewarmer.record("quiz", topic)
+    # Served from the question bank; the model is only asked to top it up
+    return await assemble_quiz(topic, count, difficulty, current_user.id if current_user else None)
+
+async def stream_quiz_questions(topic: str, count: int, difficulty: str | None):
+    """Yield one NDJSON line per MCQ as soon as its JSON object is complete."""
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
+        async for question in stream_quiz(topic, count, difficulty):
+            yield json.dumps(question) + "\n"
+    except (LLMBusyError, LLMUnavailableError) as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+    except Exception as e:
+        print(f"Quiz Streaming Error: {e}")
+        yield json.dumps({"error": "AI generation failed"}) + "\n"
+
+@router.get("/generate/stream")
+async def generate_quiz_stream(
+    topic: str,
+    count: int = Query(5, ge=1, le=QUIZ_MAX_COUNT),
+    difficulty: Literal["easy", "medium", "hard"] | None = None,
+):
+    prewarmer.record("quiz", topic)
+    return StreamingResponse(
+        stream_quiz_questions(topic, count, difficulty),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ==============================
+# BATCH GENERATION
+# ==============================
+async def generate_packed_quizzes(topics: List[str], count: int, difficulty: str | None, user_id: int | None = None):
+    """
+    Serve each topic the bank can fill on its own, then top up the rest with one
+    model call for all of them; topics missing from that answer are generated on their own.
+    """
+    results = {}
+    for topic in topics:
+        banked = await quiz_from_bank(topic, count, difficulty, user_id)
+        if banked:
+            results[topic] = banked
+    unfilled = [topic for topic in topics if topic not in results]
+    if len(unfilled) == 1:
+        results[unfilled[0]] = await assemble_quiz(unfilled[0], count, difficulty, user_id)
+    if len(unfilled) <= 1:
+        return results
+
+    raw = await generate_text_async(build_packed_quiz_prompt(unfilled, count, difficulty), route="quiz", use_cache=True)
+    try:
+        quizzes = extract_json(raw, allow_partial=True).get("quizzes", [])
+    except JSONExtractionError as e:
         print(f"JSON Parse Error: {e}")
-        print(f"Raw JSON: {json_str}")
-        return {"questions": []}
+        quizzes = []
+
+    by_topic = {
+        str(quiz.get("topic", "")).strip().lower(): {"questions": quiz.get("questions", [])}
+        for quiz in quizzes
+        if isinstance(quiz, dict)
+    }
+    for topic in unfilled:
+        found = by_topic.get(topic.lower())
+        if found and found["questions"]:
+            await bank_generated(topic, found["questions"], difficulty)
+            if not QUIZ_BANK_ENABLED:
+                results[topic] = found
+                continue
+        # Serve from the freshly topped-up bank like a single-topic quiz
+        results[topic] = await assemble_quiz(topic, count, difficulty, user_id)
+    return results
+
+async def generate_batch(
+    topics: List[str], pack_size: int, count: int = 5, difficulty: str | None = None, user_id: int | None = None
+):
+    """Yield (topic, result_or_error) pairs as each topic (or pack of topics) completes."""
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+    groups = [topics[i:i + pack_size] for i in range(0, len(topics), pack_size)]
+
+    async def run_group(group):
+        async with limit:
+            try:
+                if len(group) == 1:
+                    return {group[0]: await assemble_quiz(group[0], count, difficulty, user_id)}
+                return await generate_packed_quizzes(group, count, difficulty, user_id)
+            except (LLMBusyError, LLMUnavailableError) as e:
+                return {topic: {"error": str(e)} for topic in group}
+            except Exception as e:
+                print(f"Batch Quiz Error: {e}")
+                return {topic: {"error": "AI generation failed"} for topic in group}
+
+    for finished in asyncio.as_completed([run_group(group) for group in groups]):
+        for topic, result in (await finished).items():
+            yield topic, result
+
+def clean_topics(topics: List[str]):
+    # Drop blanks and repeats, keep the caller's order
+    seen = set()
+    cleaned = []
+    for topic in topics:
+        topic = topic.strip()
+        if topic and topic.lower() not in seen:
+            seen.add(topic.lower())
+            cleaned.append(topic)
+    return cleaned
+
+@router.post("/generate-batch")
+async def generate_quiz_batch(
+    data: QuizBatchRequest,
+    idempotency_key: str | None = Header(default=None),
+    current_user: User | None = Depends(get_optional_user),
+):
+    """
+    Generate quizzes for many topics concurrently.
+    stream=true (default) returns NDJSON, one {"topic", "questions"} line per topic as it finishes;
+    stream=false returns {"results": {topic: {...}}} once all are done.
+    Idempotency-Key is only accepted with stream=false; a stream can't be replayed.
+    """
+    topics = clean_topics(data.topics)
+    if not topics:
+        raise HTTPException(status_code=400, detail="No topics given")
+    if len(topics) > BATCH_MAX_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_TOPICS} topics per batch")
+    if not 1 <= data.count <= QUIZ_MAX_COUNT:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {QUIZ_MAX_COUNT}")
+    if idempotency_key and data.stream:
+        raise HTTPException(status_code=400, detail="Idempotency-Key requires stream=false")
+    # Large quizzes are already sharded per topic, so they are never packed together
+    pack_size = max(1, min(data.pack_size, 5)) if data.count <= QUIZ_SHARD_SIZE else 1
+    user_id = current_user.id if current_user else None
+    for topic in topics:
+        prewarmer.record("quiz", topic)
+
+    if not data.stream:
+        async def collect():
+            results = generate_batch(topics, pack_size, data.count, data.difficulty, user_id)
+            return {"results": {topic: result async for topic, result in results}}
+
+        return await run_idempotent(idempotency_key, user_id, "POST /quiz/generate-batch", data, collect)
+
+    async def lines():
+        async for topic, result in generate_batch(topics, pack_size, data.count, data.difficulty, user_id):
+            yield json.dumps({"topic": topic, **result}) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from ai.gemini import generate_text
+from ai.gemini import generate_text_async, stream_text_async
+from ai.resource_catalog import (
+    RESOURCE_CATALOG_ENABLED,
+    get_catalog_entry,
+    get_resources as get_catalog_resources,
+    is_stale,
+    save_catalog_entry,
+    schedule_refresh,
+)
+from database.session import with_session
+from utils.sse import stream_sse, single_chunk
+from utils.idempotency import run_idempotent
 
 router = APIRouter(prefix="/resources", tags=["Resources"])
 
@@ -8,11 +21,10 @@ class ResourceRequest(BaseModel):
     subject: str
     topic: str | None = None
 
-@router.post("/")
-def get_resources(data: ResourceRequest):
+def build_resources_prompt(data: ResourceRequest):
     topic_text = f" on {data.topic}" if data.topic else ""
 
-    prompt = f"""
+    return f"""
 Suggest good learning resources for a student. 
 
 Subject: {data.subject}{topic_text}
@@ -29,5 +41,42 @@ Docs:
 - title – short description
 """
 
-    resources = generate_text(prompt)
-    return {"resources": resources}
+@router.post("/")
+async def get_resources(data: ResourceRequest, idempotency_key: str | None = Header(default=None)):
+    prompt = build_resources_prompt(data)
+
+    async def generate():
+        return await generate_text_async(prompt, route="resources", use_cache=True)
+
+    async def suggest():
+        # Shared catalog lookup; the model is only called for new or stale (subject, topic) pairs
+        return await get_catalog_resources(data.subject, data.topic, generate)
+
+    return await run_idempotent(idempotency_key, None, "POST /resources/", data, suggest)
+
+async def stream_and_catalog(data: ResourceRequest, chunks):
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    if RESOURCE_CATALOG_ENABLED:
+        await run_in_threadpool(with_session, save_catalog_entry, data.subject, data.topic, "".join(parts))
+
+@router.post("/stream")
+async def get_resources_stream(data: ResourceRequest):
+    prompt = build_resources_prompt(data)
+
+    entry = None
+    if RESOURCE_CATALOG_ENABLED:
+        entry = await run_in_threadpool(with_session, get_catalog_entry, data.subject, data.topic)
+    if entry:
+        if is_stale(entry):
+            schedule_refresh(data.subject, data.topic, lambda: generate_text_async(prompt, route="resources"))
+        chunks = single_chunk(entry["resources"])
+    else:
+        chunks = stream_and_catalog(data, stream_text_async(prompt, route="resources", use_cache=True))
+    return StreamingResponse(
+        stream_sse(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -8,6 +9,8 @@ from models.saved_content import SavedQuiz, SavedResource, SavedExplanation, Use
 from models.user import User
 from utils.dependencies import get_current_user
 from database.session import get_db
+from utils.idempotency import run_idempotent
+from utils.pagination import paginate, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 router = APIRouter()
 
@@ -43,13 +46,22 @@ class UpdateNoteRequest(BaseModel):
 # SAVED QUIZZES
 # ==============================
 @router.post("/quizzes")
-def save_quiz(
+async def save_quiz(
     data: SaveQuizRequest,
+    idempotency_key: str | None = Header(default=None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    user_id = current_user.id
+
+    async def save():
+        return await run_in_threadpool(insert_saved_quiz, db, user_id, data)
+
+    return await run_idempotent(idempotency_key, user_id, "POST /saved/quizzes", data, save)
+
+def insert_saved_quiz(db: Session, user_id: int, data: SaveQuizRequest):
     saved_quiz = SavedQuiz(
-        user_id=current_user.id,
+        user_id=user_id,
         topic=data.topic,
         questions=data.questions,
         score=data.score,
@@ -67,14 +79,17 @@ def save_quiz(
 
 @router.get("/quizzes")
 def get_saved_quizzes(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    quizzes = db.query(SavedQuiz).filter(
-        SavedQuiz.user_id == current_user.id
-    ).order_by(SavedQuiz.created_at.desc()).all()
+    quizzes, next_cursor = paginate(
+        db.query(SavedQuiz).filter(SavedQuiz.user_id == current_user.id),
+        SavedQuiz.created_at, SavedQuiz.id, limit, cursor
+    )
     
-    return [
+    items = [
         {
             "id": quiz.id,
             "topic": quiz.topic,
@@ -87,6 +102,8 @@ def get_saved_quizzes(
         for quiz in quizzes
     ]
 
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.delete("/quizzes/{quiz_id}")
 def delete_saved_quiz(
     quiz_id: int,
@@ -133,14 +150,17 @@ def save_resource(
 
 @router.get("/resources")
 def get_saved_resources(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    resources = db.query(SavedResource).filter(
-        SavedResource.user_id == current_user.id
-    ).order_by(SavedResource.created_at.desc()).all()
+    resources, next_cursor = paginate(
+        db.query(SavedResource).filter(SavedResource.user_id == current_user.id),
+        SavedResource.created_at, SavedResource.id, limit, cursor
+    )
     
-    return [
+    items = [
         {
             "id": resource.id,
             "title": resource.title,
@@ -152,6 +172,8 @@ def get_saved_resources(
         for resource in resources
     ]
 
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.delete("/resources/{resource_id}")
 def delete_saved_resource(
     resource_id: int,
@@ -197,14 +219,17 @@ def save_explanation(
 
 @router.get("/explanations")
 def get_saved_explanations(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    explanations = db.query(SavedExplanation).filter(
-        SavedExplanation.user_id == current_user.id
-    ).order_by(SavedExplanation.created_at.desc()).all()
+    explanations, next_cursor = paginate(
+        db.query(SavedExplanation).filter(SavedExplanation.user_id == current_user.id),
+        SavedExplanation.created_at, SavedExplanation.id, limit, cursor
+    )
     
-    return [
+    items = [
         {
             "id": explanation.id,
             "topic": explanation.topic,
@@ -215,6 +240,8 @@ def get_saved_explanations(
         for explanation in explanations
     ]
 
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.delete("/explanations/{explanation_id}")
 def delete_saved_explanation(
     explanation_id: int,
@@ -264,14 +291,17 @@ def create_note(
 
 @router.get("/notes")
 def get_notes(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    notes = db.query(UserNote).filter(
-        UserNote.user_id == current_user.id
-    ).order_by(UserNote.updated_at.desc()).all()
+    notes, next_cursor = paginate(
+        db.query(UserNote).filter(UserNote.user_id == current_user.id),
+        UserNote.created_at, UserNote.id, limit, cursor
+    )
     
-    return [
+    items = [
         {
             "id": note.id,
             "title": note.title,
@@ -283,6 +313,8 @@ def get_notes(
         for note in notes
     ]
 
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.put("/notes/{note_id}")
 def update_note(
     note_id: int,
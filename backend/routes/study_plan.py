@@ -1,79 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import json as json_lib, re
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, load_only
+import json as json_lib
 
 from models.student import StudyRequest
-from models.study_plan import StudyPlan
+from models.study_plan import StudyPlan, summarize_plan, plan_total_days
 from models.user import User
 
-from ai.gemini import generate_text
+from ai.planner import generate_plan, regenerate_remaining_days
+from ai.plan_templates import build_study_plan
+from ai.prewarm import prewarmer
+from ai.question_bank import warm_topic
+from utils.json_extract import JSONExtractionError
 from utils.dependencies import get_current_user
-from database.session import get_db
-
-def parse_progress_data(completed_day_numbers_str):
-    """
-    Parse progress data from database, handling both old and new formats
-    Old format: "1,2,3" (comma-separated string)
-    New format: '{"plan_id": [1,2,3]}' (JSON string)
-    """
-    if not completed_day_numbers_str:
-        return {}
-    
-    try:
-        # Try to parse as JSON first (new format)
-        data = json_lib.loads(completed_day_numbers_str)
-        if isinstance(data, dict):
-            return data
-        else:
-            # If it's not a dict, treat as old format
-            return {}
-    except (json_lib.JSONDecodeError, ValueError):
-        # If JSON parsing fails, it might be old comma-separated format
-        # For now, return empty dict to start fresh
-        return {}
+from utils.jobs import job_queue, job_to_dict, JobQueueFullError
+from utils.idempotency import run_idempotent
+from utils.plan_progress import get_completed_days, get_completed_days_by_plan, init_plan_progress, delete_plan_progress
+from utils.pagination import paginate, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
+from utils.sse import format_sse
+from database.session import get_db, with_session
 
 router = APIRouter(prefix="/study", tags=["Study Plans"])
 
+# Popular plan subjects get their quiz question bank filled ahead of time
+prewarmer.register("plan", warm_topic)
+
 
 # ==============================
 # CREATE STUDY PLAN (AI + SAVE)
 # ==============================
 @router.post("/plan")
-def create_study_plan(
+async def create_study_plan(
     data: StudyRequest,
+    background: bool = False,
+    idempotency_key: str | None = Header(default=None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    prompt = f"""
-Create a {data.deadline_days}-day study plan for {data.subject}.
-Weak areas: {", ".join(data.weak_areas)}
-
-Return ONLY JSON in this format:
-{{
-  "days": [
-    {{
-      "day": 1,
-      "topic": "Topic name",
-      "tasks": ["Task 1", "Task 2"]
-    }}
-  ]
-}}
-"""
-
-    raw = generate_text(prompt)
-
-    match = re.search(r"\{.*\}", raw, re.DOTALL)
-    if not match:
-        raise HTTPException(status_code=500, detail="AI response invalid")
-
-    plan_json = json_lib.loads(match.group())
+    """
+    background=true returns a job right away (202) and builds the plan in a
+    worker; poll GET /study/jobs/{job_id} or stream /study/jobs/{job_id}/events.
+    Retries with the same Idempotency-Key header replay the first response.
+    """
+    user_id = current_user.id
+    prewarmer.record("plan", data.subject)
+
+    async def create():
+        if background:
+            try:
+                job = job_queue.submit("study_plan", user_id, lambda: run_study_plan_job(user_id, data))
+            except JobQueueFullError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+            return {"job_id": job["id"], "status": job["status"]}
+
+        try:
+            plan_json = await build_study_plan(data.subject, data.weak_areas, data.deadline_days)
+        except JSONExtractionError as e:
+            print(f"JSON Parse Error: {e}")
+            raise HTTPException(status_code=500, detail="AI response invalid")
+
+        # DB work is blocking, keep it off the event loop
+        plan_id = await run_in_threadpool(save_study_plan, db, user_id, data, plan_json)
+
+        # Return the plan data with ID
+        return {
+            "plan_id": plan_id,
+            "plan_data": plan_json
+        }
+
+    result = await run_idempotent(
+        idempotency_key, user_id, "POST /study/plan", {"body": data, "background": background}, create
+    )
+    if background:
+        return JSONResponse(status_code=202, content=result)
+    return result
+
+
+async def run_study_plan_job(user_id: int, data: StudyRequest):
+    try:
+        plan_json = await build_study_plan(data.subject, data.weak_areas, data.deadline_days)
+    except JSONExtractionError as e:
+        print(f"JSON Parse Error: {e}")
+        raise RuntimeError("AI response invalid")
+
+    # The request's session is gone by now, so the job opens its own
+    plan_id = await run_in_threadpool(with_session, save_study_plan, user_id, data, plan_json)
+    return {
+        "plan_id": plan_id,
+        "plan_data": plan_json
+    }
 
+
+def save_study_plan(db: Session, user_id: int, data: StudyRequest, plan_json: dict):
     study_plan = StudyPlan(
-        user_id=current_user.id,
+        user_id=user_id,
         subject=data.subject,
         weak_areas=", ".join(data.weak_areas),
         deadline_days=data.deadline_days,
         plan_data=plan_json,
+        **summarize_plan(plan_json),
     )
 
     db.add(study_plan)
@@ -81,38 +108,51 @@ Return ONLY JSON in this format:
     db.refresh(study_plan)
 
     # Initialize progress for this specific plan
-    from models.user_progress import UserProgress
-    import json
-    
-    # Get or create user progress
-    progress = db.query(UserProgress).filter(UserProgress.user_id == current_user.id).first()
-    if not progress:
-        progress = UserProgress(
-            user_id=current_user.id,
-            total_days=0,
-            completed_days=0,
-            completed_day_numbers="{}"
-        )
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
-    
-    # Parse existing progress
-    plan_progress = parse_progress_data(progress.completed_day_numbers)
-    
-    # Initialize this plan's progress
-    total_days = len(plan_json.get("days", []))
-    plan_progress[str(study_plan.id)] = []
-    
-    # Update the progress record
-    progress.completed_day_numbers = json_lib.dumps(plan_progress)
-    db.commit()
+    init_plan_progress(db, user_id, study_plan.id, study_plan.total_days)
+
+    return study_plan.id
+
+
+# ==============================
+# BACKGROUND PLAN JOBS
+# ==============================
+def get_user_job(job_id: str, user_id: int):
+    job = job_queue.get(job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+def get_study_plan_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    return job_to_dict(get_user_job(job_id, current_user.id))
 
-    # Return the plan data with ID
-    return {
-        "plan_id": study_plan.id,
-        "plan_data": plan_json
-    }
+
+@router.get("/jobs/{job_id}/events")
+async def stream_study_plan_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    job = get_user_job(job_id, current_user.id)
+
+    async def events():
+        yield format_sse(json_lib.dumps({"status": job["status"]}), event="status")
+        while not job["done"].is_set():
+            try:
+                await asyncio.wait_for(job["done"].wait(), timeout=15)
+            except asyncio.TimeoutError:
+                # Keep-alive so proxies don't drop the idle connection
+                yield format_sse(json_lib.dumps({"status": job["status"]}), event="status")
+        yield format_sse(json_lib.dumps(job_to_dict(job)), event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ==============================
@@ -120,45 +160,47 @@ Return ONLY JSON in this format:
 # ==============================
 @router.get("/plans")
 def list_study_plans(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    plans = (
+    # Only the summary columns; plan_data is never loaded or decoded here
+    plans, next_cursor = paginate(
         db.query(StudyPlan)
-        .filter(StudyPlan.user_id == current_user.id)
-        .order_by(StudyPlan.created_at.desc())
-        .all()
+        .options(load_only(
+            StudyPlan.id,
+            StudyPlan.subject,
+            StudyPlan.deadline_days,
+            StudyPlan.created_at,
+            StudyPlan.total_days,
+            StudyPlan.topic_summary,
+        ))
+        .filter(StudyPlan.user_id == current_user.id),
+        StudyPlan.created_at, StudyPlan.id, limit, cursor
     )
 
-    # Get progress for each plan
-    from models.user_progress import UserProgress
-    
-    # Get user's progress record
-    progress_record = db.query(UserProgress).filter(UserProgress.user_id == current_user.id).first()
-    plan_progress = {}
-    
-    if progress_record:
-        plan_progress = parse_progress_data(progress_record.completed_day_numbers)
-    
+    plan_progress = get_completed_days_by_plan(db, current_user.id, [p.id for p in plans])
+
     result = []
     
     for p in plans:
-        plan_completed_days = plan_progress.get(str(p.id), [])
-        completed_days = len(plan_completed_days)
-        total_days = len(p.plan_data.get("days", [])) if p.plan_data else 0
+        completed_days = len(plan_progress[p.id]) if p.id in plan_progress else 0
+        total_days = plan_total_days(p)
         is_completed = completed_days >= total_days if total_days > 0 else False
         
         result.append({
             "id": p.id,
             "subject": p.subject,
             "deadline_days": p.deadline_days,
+            "topic_summary": p.topic_summary,
             "created_at": p.created_at,
             "completed_days": completed_days,
             "total_days": total_days,
             "is_completed": is_completed
         })
 
-    return result
+    return {"items": result, "next_cursor": next_cursor}
 
 
 # ==============================
@@ -182,21 +224,8 @@ def get_study_plan(
     if not plan:
         raise HTTPException(status_code=404, detail="Study plan not found")
 
-    # Get plan-specific progress
-    from models.user_progress import UserProgress
-    
-    progress_record = db.query(UserProgress).filter(UserProgress.user_id == current_user.id).first()
-    
-    completed_days = 0
-    is_completed = False
-    
-    if progress_record:
-        plan_progress = parse_progress_data(progress_record.completed_day_numbers)
-        if isinstance(plan_progress, dict):
-            plan_completed_days = plan_progress.get(str(plan_id), [])
-            completed_days = len(plan_completed_days)
-    
-    total_days = len(plan.plan_data.get("days", []))
+    completed_days = len(get_completed_days(db, current_user.id, plan_id))
+    total_days = plan_total_days(plan)
     is_completed = completed_days >= total_days if total_days > 0 else False
 
     return {
@@ -233,6 +262,7 @@ def delete_study_plan(
     if not plan:
         raise HTTPException(status_code=404, detail="Study plan not found")
 
+    delete_plan_progress(db, plan.id)
     db.delete(plan)
     db.commit()
 
@@ -243,46 +273,58 @@ def delete_study_plan(
 # REGENERATE STUDY PLAN
 # ==============================
 @router.put("/plans/{plan_id}/regenerate")
-def regenerate_study_plan(
+async def regenerate_study_plan(
     plan_id: int,
+    mode: str = "full",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    plan = (
+    """
+    mode=full rebuilds the whole plan.
+    mode=remaining keeps the days the student already completed and only
+    regenerates the rest.
+    """
+    if mode not in ("full", "remaining"):
+        raise HTTPException(status_code=400, detail="mode must be 'full' or 'remaining'")
+
+    plan = await run_in_threadpool(get_user_plan, db, plan_id, current_user.id)
+
+    if not plan:
+        raise HTTPException(status_code=404, detail="Study plan not found")
+
+    weak_areas = [area.strip() for area in (plan.weak_areas or "").split(",") if area.strip()]
+
+    try:
+        if mode == "remaining":
+            completed_days = (await run_in_threadpool(get_completed_days, db, current_user.id, plan.id)).to_list()
+            total_days = max(len((plan.plan_data or {}).get("days", [])), plan.deadline_days or 0)
+            plan_data = await regenerate_remaining_days(
+                plan.subject, weak_areas, plan.plan_data, total_days, completed_days
+            )
+        else:
+            plan_data = await generate_plan(plan.subject, weak_areas, plan.deadline_days)
+    except JSONExtractionError as e:
+        print(f"JSON Parse Error: {e}")
+        raise HTTPException(status_code=500, detail="AI generation failed")
+
+    return await run_in_threadpool(update_plan_data, db, plan, plan_data)
+
+
+def get_user_plan(db: Session, plan_id: int, user_id: int):
+    return (
         db.query(StudyPlan)
         .filter(
             StudyPlan.id == plan_id,
-            StudyPlan.user_id == current_user.id,
+            StudyPlan.user_id == user_id,
         )
         .first()
     )
 
-    if not plan:
-        raise HTTPException(status_code=404, detail="Study plan not found")
-
-    prompt = f"""
-Create a {plan.deadline_days}-day study plan for {plan.subject}.
-Weak areas: {plan.weak_areas}
-
-Return ONLY JSON in this format:
-{{
-  "days": [
-    {{
-      "day": 1,
-      "topic": "Topic name",
-      "tasks": ["Task 1", "Task 2"]
-    }}
-  ]
-}}
-"""
-
-    raw = generate_text(prompt)
-    match = re.search(r"\{.*\}", raw, re.DOTALL)
-
-    if not match:
-        raise HTTPException(status_code=500, detail="AI generation failed")
 
-    plan.plan_data = json_lib.loads(match.group())
+def update_plan_data(db: Session, plan: StudyPlan, plan_data: dict):
+    plan.plan_data = plan_data
+    for key, value in summarize_plan(plan_data).items():
+        setattr(plan, key, value)
     db.commit()
     db.refresh(plan)
 
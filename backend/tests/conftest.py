@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import backend modules the same way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# database.session builds its engine at import; tests that need a database patch in their own
+os.environ.setdefault("DATABASE_URL", "sqlite://")
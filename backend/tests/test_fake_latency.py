@@ -0,0 +1,39 @@
+import statistics
+
+import pytest
+
+from ai import backends
+
+
+@pytest.fixture
+def default_latency(monkeypatch):
+    # The documented defaults, whatever the local .env sets
+    monkeypatch.setattr(backends, "FAKE_LATENCY_DISTRIBUTION", "lognormal")
+    monkeypatch.setattr(backends, "FAKE_LATENCY_MS", 800.0)
+    monkeypatch.setattr(backends, "FAKE_LATENCY_JITTER_MS", 300.0)
+
+
+def sample(count=20000):
+    fake = backends.FakeBackend()
+    return sorted(fake._latency_seconds() for _ in range(count))
+
+
+def test_default_latencies_are_bounded(default_latency):
+    latencies = sample()
+    assert latencies[0] > 0
+    assert latencies[-1] <= 8.0
+    assert statistics.median(latencies) == pytest.approx(0.8, rel=0.05)
+    # sigma = log1p(300 / 800) ~ 0.32, so p99 ~ 0.8 * e^(2.33 * 0.32) ~ 1.68s
+    assert latencies[int(len(latencies) * 0.99)] == pytest.approx(1.68, rel=0.1)
+
+
+def test_large_jitter_is_clamped(default_latency, monkeypatch):
+    monkeypatch.setattr(backends, "FAKE_LATENCY_JITTER_MS", 60000.0)
+    latencies = sample()
+    assert latencies[-1] <= 800 * backends.FAKE_LATENCY_MAX_FACTOR / 1000
+    # sigma capped at 1: p99 ~ 0.8 * e^2.33 ~ 8.2s, which the latency cap trims to 8s
+    assert latencies[int(len(latencies) * 0.9)] < 3.5
+
+
+def test_seeded_latencies_repeat(default_latency):
+    assert sample(100) == sample(100)
@@ -0,0 +1,38 @@
+import pytest
+
+from utils.json_extract import extract_json, repair_json_text, JSONExtractionError, TRAILING_COMMA_RETRIES
+
+
+def test_trailing_commas_are_dropped_outside_strings():
+    raw = '```json\n{"a": [1, 2, ], "b": {"c": "keep , ] this",},}\n```'
+    assert extract_json(raw) == {"a": [1, 2], "b": {"c": "keep , ] this"}}
+
+
+def test_many_trailing_commas_fall_back_to_repair_pass():
+    items = ", ".join(f'{{"n": {n},}}' for n in range(TRAILING_COMMA_RETRIES + 3))
+    assert extract_json(f'{{"items": [{items}]}}') == {"items": [{"n": n} for n in range(TRAILING_COMMA_RETRIES + 3)]}
+
+
+def test_raw_control_characters_inside_strings_are_kept():
+    assert extract_json('{"text": "line one\nline two\tend"}') == {"text": "line one\nline two\tend"}
+    # Same answer with a trailing comma, and with a defect only the repair pass fixes
+    assert extract_json('{"text": "line one\nline two",}') == {"text": "line one\nline two"}
+    assert extract_json('{“text”: “line one\nline two”}') == {"text": "line one\nline two"}
+
+
+def test_curly_quotes_become_ascii():
+    assert extract_json('{“a”: “he said "hi"”, "b": 2}') == {"a": 'he said "hi"', "b": 2}
+
+
+def test_truncated_answer_keeps_complete_values():
+    raw = '{"days": [{"day": 1}, {"day": 2}, {"day": 3, "topic": "cut'
+    assert extract_json(raw, allow_partial=True) == {"days": [{"day": 1}, {"day": 2}]}
+    with pytest.raises(JSONExtractionError):
+        extract_json(raw)
+
+
+def test_mismatched_bracket_reports_position():
+    with pytest.raises(JSONExtractionError) as error:
+        repair_json_text('{"a": [1, 2}')
+    assert error.value.reason == "mismatched bracket"
+    assert error.value.position == 11
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import migrate_plan_progress
+from models.plan_progress import PlanProgress
+from models.study_plan import StudyPlan
+from models.user import User
+from models.user_progress import UserProgress
+from utils.plan_progress import row_days
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(migrate_plan_progress, "engine", engine)
+    monkeypatch.setattr(migrate_plan_progress, "get_db", get_db)
+    migrate_plan_progress.Base.metadata.create_all(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def add_plan(db, days=5):
+    user = User(email="student@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    plan = StudyPlan(
+        user_id=user.id, subject="Biology", deadline_days=days,
+        plan_data={"days": [{"day": n, "topic": f"Topic {n}"} for n in range(1, days + 1)]},
+    )
+    db.add(plan)
+    db.flush()
+    return user, plan
+
+
+def stored_days(db, plan_id):
+    db.expire_all()
+    row = db.query(PlanProgress).filter(PlanProgress.plan_id == plan_id).one()
+    return row, row_days(row.completed_days_mask, row.completed_day_numbers).to_list()
+
+
+def test_blob_days_are_moved_to_plan_rows(db):
+    user, plan = add_plan(db)
+    plan_id = plan.id
+    db.add(UserProgress(user_id=user.id, completed_day_numbers=json.dumps({str(plan_id): [1, 2]})))
+    db.commit()
+
+    migrate_plan_progress.migrate()
+
+    row, days = stored_days(db, plan_id)
+    assert days == [1, 2]
+    assert row.completed_days == 2
+
+
+def test_blob_days_merge_into_rows_from_an_earlier_migration(db):
+    # The first plan_progress migration created zeroed rows and left the days in the blob
+    user, plan = add_plan(db, days=3)
+    plan_id = plan.id
+    db.add(UserProgress(user_id=user.id, completed_day_numbers=json.dumps({str(plan_id): [1, 2]})))
+    db.add(PlanProgress(user_id=user.id, plan_id=plan_id, total_days=3, completed_day_numbers="3"))
+    db.commit()
+
+    migrate_plan_progress.migrate()
+
+    row, days = stored_days(db, plan_id)
+    assert days == [1, 2, 3]
+    assert row.completed_days == 3
+    assert row.is_completed
+
+
+def test_runs_before_the_study_plan_summary_columns_exist(db):
+    user, plan = add_plan(db)
+    plan_id = plan.id
+    db.add(UserProgress(user_id=user.id, completed_day_numbers=json.dumps({str(plan_id): [4]})))
+    db.commit()
+    db.execute(text("ALTER TABLE study_plans DROP COLUMN topic_summary"))
+    db.execute(text("ALTER TABLE study_plans DROP COLUMN total_days"))
+    db.commit()
+
+    migrate_plan_progress.migrate()
+
+    assert stored_days(db, plan_id)[1] == [4]
@@ -0,0 +1,53 @@
+from ai.question_index import MinHashIndex, normalize_question
+
+
+def make_index():
+    return MinHashIndex(threshold=0.8, max_entries=100)
+
+
+def test_language_symbols_are_kept():
+    assert normalize_question("What are C# classes?") == "c# classes"
+    assert normalize_question("C++ templates.") == "c++ templates"
+
+
+def test_c_sharp_answer_is_not_served_for_c():
+    index = make_index()
+    index.insert("C# classes", "C# classes are reference types...")
+    assert index.lookup("C classes") is None
+    assert index.lookup("C++ classes") is None
+
+
+def test_long_questions_differing_only_by_language_do_not_match():
+    index = make_index()
+    index.insert("Explain inheritance and polymorphism in object oriented programming with C#", "C# answer")
+    assert index.lookup("Explain inheritance and polymorphism in object oriented programming with C") is None
+
+
+def test_rephrased_question_still_matches():
+    index = make_index()
+    index.insert("Explain photosynthesis in plants", "Plants turn light into sugar")
+    match = index.lookup("Please explain the photosynthesis in plants?")
+    assert match is not None and match[1] == "Plants turn light into sugar"
+
+
+def test_question_words_are_not_filler():
+    index = make_index()
+    index.insert("How does a transistor work", "Transistor answer")
+    assert normalize_question("Why does a transistor work") != normalize_question("How does a transistor work")
+
+
+def test_request_phrasings_match_each_other():
+    index = make_index()
+    index.insert("explain recursion", "A function that calls itself")
+    for question in ["What is recursion?", "explain recursion simply", "recursion?", "What's recursion"]:
+        match = index.lookup(question)
+        assert match is not None and match[1] == "A function that calls itself"
+
+
+def test_numbers_must_match_exactly():
+    index = make_index()
+    index.insert("What were the main causes of WW1?", "WW1 answer")
+    index.insert("What happened in the year 1914?", "1914 answer")
+    assert index.lookup("What were the main causes of WW2?") is None
+    assert index.lookup("What happened in the year 1945?") is None
+    assert index.lookup("what were the main causes of ww1")[1] == "WW1 answer"
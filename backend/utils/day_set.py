@@ -0,0 +1,70 @@
+class DaySet:
+    """
+    Set of 1-based day numbers kept as the bits of one int (day n is bit n - 1).
+    Adding and testing a day are single bit operations, len() is a popcount,
+    and plans combine with | and & without building lists. Stored as
+    little-endian bytes, so a 30-day plan takes 4 bytes.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_days(cls, days):
+        bits = 0
+        for day in days:
+            bits |= cls._bit(day)
+        return cls(bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | None):
+        return cls(int.from_bytes(data or b"", "little"))
+
+    @staticmethod
+    def _bit(day: int):
+        if day < 1:
+            raise ValueError(f"Day numbers start at 1, got {day}")
+        return 1 << (day - 1)
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def to_list(self):
+        """Sorted day numbers, the format the API returns."""
+        days, bits, day = [], self.bits, 1
+        while bits:
+            if bits & 1:
+                days.append(day)
+            bits >>= 1
+            day += 1
+        return days
+
+    def add(self, day: int):
+        self.bits |= self._bit(day)
+
+    def discard(self, day: int):
+        if day >= 1:
+            self.bits &= ~(1 << (day - 1))
+
+    def __contains__(self, day: int):
+        return day >= 1 and bool(self.bits >> (day - 1) & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __or__(self, other: "DaySet"):
+        return DaySet(self.bits | other.bits)
+
+    def __and__(self, other: "DaySet"):
+        return DaySet(self.bits & other.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, DaySet) and self.bits == other.bits
+
+    def __repr__(self):
+        return f"DaySet({self.to_list()})"
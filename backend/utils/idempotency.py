@@ -0,0 +1,177 @@
+import os
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+
+from ai.usage import current_user_id
+from database.session import SessionLocal
+from models.idempotency_key import IdempotencyKey
+
+load_dotenv()
+
+# -----------------------
+# IDEMPOTENCY CONFIG
+# -----------------------
+# How long a stored response is replayed for the same key
+IDEMPOTENCY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_TTL_HOURS", 24)))
+# An in_progress key older than this is assumed abandoned (e.g. a crashed worker)
+IDEMPOTENCY_STALE = timedelta(minutes=int(os.getenv("IDEMPOTENCY_STALE_MINUTES", 10)))
+# How long a retry waits for the original request to finish before giving up
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 120))
+
+# Requests currently running in this process, so retries can await them directly
+_in_flight = {}  # (user_id, key) -> asyncio.Event
+
+
+def request_fingerprint(request) -> str:
+    """Hash of the canonical JSON of a request body, so a key can't be reused for a different request."""
+    canonical = json.dumps(jsonable_encoder(request), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _claim_key(user_id: int, key: str, endpoint: str, request_hash: str):
+    """
+    Try to claim (user_id, key). Returns ("claimed", None), ("done", response)
+    or ("in_progress", None).
+    """
+    db = SessionLocal()
+    try:
+        record = db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key
+        ).first()
+
+        if record:
+            if record.endpoint != endpoint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different endpoint")
+            if record.request_hash != request_hash:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+
+            age = datetime.utcnow() - record.created_at
+            expired = age > IDEMPOTENCY_TTL or (record.status == "in_progress" and age > IDEMPOTENCY_STALE)
+            if not expired:
+                return record.status, record.response
+            db.delete(record)
+            db.commit()
+
+        db.add(IdempotencyKey(
+            user_id=user_id, key=key, endpoint=endpoint, request_hash=request_hash, status="in_progress"
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request claimed the key between our read and insert
+            db.rollback()
+            return "in_progress", None
+        return "claimed", None
+    finally:
+        db.close()
+
+
+def _load_key(user_id: int, key: str):
+    db = SessionLocal()
+    try:
+        return db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key
+        ).first()
+    finally:
+        db.close()
+
+
+def _finish_key(user_id: int, key: str, response):
+    db = SessionLocal()
+    try:
+        record = db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key
+        ).first()
+        if record:
+            record.status = "done"
+            record.response = response
+            db.commit()
+    finally:
+        db.close()
+
+
+def _release_key(user_id: int, key: str):
+    # The original request failed: forget the key so a retry can run again
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == "in_progress"
+        ).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _wait_for_original(user_id: int, key: str):
+    local = _in_flight.get((user_id, key))
+    if local:
+        try:
+            await asyncio.wait_for(local.wait(), timeout=IDEMPOTENCY_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    else:
+        # The original is running in another process: poll the table
+        deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_SECONDS
+        while asyncio.get_running_loop().time() < deadline:
+            record = await run_in_threadpool(_load_key, user_id, key)
+            if not record or record.status == "done":
+                break
+            await asyncio.sleep(0.5)
+
+    record = await run_in_threadpool(_load_key, user_id, key)
+    if record and record.status == "done":
+        return record.response
+    raise HTTPException(
+        status_code=409,
+        detail="A request with this Idempotency-Key is still in progress or failed; retry later",
+    )
+
+
+async def run_idempotent(key: str | None, user_id: int | None, endpoint: str, request, fn):
+    """
+    Run fn (an async callable returning a JSON-able dict) at most once per
+    (user, Idempotency-Key). Retries get the stored first response, and a retry
+    that arrives while the original is still running waits for its result.
+    request is everything that shapes the response (body and options); reusing
+    a key with a different request is a 422. Keys belong to the signed-in
+    user, so anonymous callers can't use them. Without a key, fn simply runs.
+    """
+    if not key:
+        return await fn()
+
+    user_id = user_id or current_user_id.get()
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Idempotency-Key requires a signed-in user")
+    status, response = await run_in_threadpool(_claim_key, user_id, key, endpoint, request_fingerprint(request))
+    if status == "done":
+        return response
+    if status == "in_progress":
+        return await _wait_for_original(user_id, key)
+
+    done = asyncio.Event()
+    _in_flight[(user_id, key)] = done
+    try:
+        result = jsonable_encoder(await fn())
+    except BaseException:
+        # Cancellation too (client gone, server shutdown), or the key stays in_progress;
+        # shield() lets the release finish while this task is being cancelled
+        await asyncio.shield(run_in_threadpool(_release_key, user_id, key))
+        raise
+    else:
+        await run_in_threadpool(_finish_key, user_id, key, result)
+        return result
+    finally:
+        _in_flight.pop((user_id, key), None)
+        done.set()
@@ -0,0 +1,150 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+
+from ai.usage import current_user_id
+
+load_dotenv()
+
+# -----------------------
+# JOB QUEUE CONFIG
+# -----------------------
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", 100))
+# Finished jobs are kept this long (seconds) so clients can still poll the result
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 60 * 60))
+
+
+class JobQueueFullError(Exception):
+    """Raised when the background job queue cannot accept more work."""
+
+
+class JobQueue:
+    """
+    In-process background job queue: a fixed pool of asyncio workers pulls
+    jobs off a bounded queue. Job state lives in memory and is pruned after
+    JOB_RESULT_TTL seconds.
+    """
+
+    def __init__(self, workers: int, max_queued: int):
+        self.worker_count = workers
+        self.max_queued = max_queued
+        self.queue = None
+        self.workers = []
+        self.jobs = OrderedDict()  # job_id -> job dict
+        self.wait_times = deque(maxlen=500)
+        self.run_times = deque(maxlen=500)
+        self.counts = {"submitted": 0, "done": 0, "failed": 0}
+
+    def start(self):
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queued)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, kind: str, user_id: int, fn):
+        """Queue fn (an async callable returning a JSON-able result) and return the job."""
+        if self.queue is None:
+            raise RuntimeError("Job queue is not started")
+        self._prune()
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "user_id": user_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "done": asyncio.Event(),
+        }
+        try:
+            self.queue.put_nowait((job, fn))
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Too many background jobs queued")
+
+        self.jobs[job["id"]] = job
+        self.counts["submitted"] += 1
+        return job
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job, fn = await self.queue.get()
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self.wait_times.append(job["started_at"] - job["created_at"])
+            # Model calls made by the job are accounted to the user who submitted it
+            current_user_id.set(job["user_id"])
+            try:
+                job["result"] = await fn()
+                job["status"] = "done"
+                self.counts["done"] += 1
+            except Exception as e:
+                print(f"❌ Job {job['id']} ({job['kind']}) failed: {e}")
+                job["error"] = str(e) or e.__class__.__name__
+                job["status"] = "failed"
+                self.counts["failed"] += 1
+            finally:
+                job["finished_at"] = time.time()
+                self.run_times.append(job["finished_at"] - job["started_at"])
+                job["done"].set()
+                self.queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RESULT_TTL
+        for job_id in list(self.jobs):
+            job = self.jobs[job_id]
+            if job["finished_at"] and job["finished_at"] < cutoff:
+                del self.jobs[job_id]
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {"p50": None, "p95": None}
+        ordered = sorted(samples)
+        return {
+            "p50": round(ordered[len(ordered) // 2], 3),
+            "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        }
+
+    def get_stats(self):
+        running = sum(1 for job in self.jobs.values() if job["status"] == "running")
+        return {
+            "workers": self.worker_count,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queued": self.max_queued,
+            "running": running,
+            "counts": dict(self.counts),
+            "wait_seconds": self._percentiles(self.wait_times),
+            "run_seconds": self._percentiles(self.run_times),
+        }
+
+
+def job_to_dict(job: dict):
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+job_queue = JobQueue(JOB_WORKERS, JOB_QUEUE_MAX)
@@ -0,0 +1,181 @@
+import json
+import re
+
+# Curly quotes some models emit instead of ASCII double quotes
+SMART_OPEN_QUOTES = "“„"
+SMART_CLOSE_QUOTES = "”"
+CLOSERS = {"{": "}", "[": "]"}
+SPECIAL_CHARS = re.compile(r'[{}\[\],"\\“”„]')
+# A comma, optional whitespace, then the closer it should not precede
+TRAILING_COMMA = re.compile(r",\s*[}\]]")
+# Trailing commas dropped by re-decoding before falling back to the full repair pass
+TRAILING_COMMA_RETRIES = 4
+# strict=False: models put raw newlines and tabs inside long string values
+_decoder = json.JSONDecoder(strict=False)
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no usable JSON object can be recovered from LLM output."""
+
+    def __init__(self, reason: str, position: int = -1, snippet: str = ""):
+        self.reason = reason
+        self.position = position
+        self.snippet = snippet
+        super().__init__(f"{reason} (at {position}): {snippet!r}" if snippet else reason)
+
+    def to_dict(self):
+        return {"reason": self.reason, "position": self.position, "snippet": self.snippet}
+
+
+def _snippet(text: str, position: int, width: int = 40):
+    start = max(position - width, 0)
+    return text[start:position + width]
+
+
+def repair_json_text(raw: str, allow_partial: bool = False):
+    """
+    Single linear pass over raw LLM output that returns the outermost balanced
+    JSON object as a repaired string.
+
+    Repairs done on the fly (no extra full-string copies):
+    - text before the first "{" and after its matching "}" is ignored,
+      which also drops ```json code fences
+    - trailing commas before "}" or "]" are removed
+    - curly quotes used as string delimiters become ASCII quotes
+
+    Plain spans between structural characters are copied as whole slices.
+
+    With allow_partial=True a truncated answer is cut back to the last complete
+    value and its open containers are closed, so e.g. 17 of 30 plan days survive.
+    """
+    start = raw.find("{")
+    if start == -1:
+        raise JSONExtractionError("no JSON object found")
+
+    out = []
+    stack = []
+    in_string = False
+    smart_string = False
+    pending_comma = False
+    safe_len = 0
+    safe_stack = []
+    pos = start     # everything before pos has been copied to out
+    skip_to = -1    # index of a char escaped by a backslash
+
+    # Jump between structural characters; plain spans are copied as slices
+    for match in SPECIAL_CHARS.finditer(raw, start):
+        i = match.start()
+        if i == skip_to:
+            continue
+        ch = raw[i]
+
+        if in_string:
+            if ch == "\\":
+                skip_to = i + 1
+                continue
+            if ch == '"' and smart_string:
+                # A bare ASCII quote inside a curly-quoted string must be escaped
+                out.append(raw[pos:i])
+                out.append('\\"')
+                pos = i + 1
+            elif (ch == '"' and not smart_string) or (ch in SMART_CLOSE_QUOTES and smart_string):
+                in_string = False
+                out.append(raw[pos:i])
+                out.append('"')
+                pos = i + 1
+            continue
+
+        span = raw[pos:i]
+        if pending_comma and not span.isspace() and span:
+            out.append(",")
+            pending_comma = False
+        out.append(span)
+        pos = i + 1
+
+        if pending_comma:
+            pending_comma = False
+            if ch not in "}]":
+                out.append(",")
+
+        if ch == ",":
+            pending_comma = True
+        elif ch == '"' or ch in SMART_OPEN_QUOTES or ch in SMART_CLOSE_QUOTES:
+            in_string = True
+            smart_string = ch != '"'
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            if not stack or CLOSERS[stack[-1]] != ch:
+                raise JSONExtractionError("mismatched bracket", i, _snippet(raw, i))
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out)
+            safe_len = len(out)
+            safe_stack = list(stack)
+        else:
+            out.append(ch)
+
+    if not allow_partial or not safe_stack:
+        raise JSONExtractionError("truncated JSON object", len(raw), _snippet(raw, len(raw)))
+
+    del out[safe_len:]
+    out.extend(CLOSERS[opener] for opener in reversed(safe_stack))
+    return "".join(out)
+
+
+def _trailing_comma_at(text: str, position: int):
+    """Index of the trailing comma a decode error at position points to, or -1."""
+    if TRAILING_COMMA.match(text, position):
+        # Python 3.13+ reports the comma itself
+        return position
+    if position < len(text) and text[position] in "}]":
+        # Older versions report the closer after it
+        comma = position - 1
+        while comma >= 0 and text[comma] in " \t\r\n":
+            comma -= 1
+        if comma >= 0 and text[comma] == ",":
+            return comma
+    return -1
+
+
+def _decode_dropping_trailing_commas(raw: str, start: int):
+    """
+    Decode from start with the C decoder; each time it stops at a trailing
+    comma, drop that comma and decode again. The decoder only stops on
+    structure, so commas inside strings are never touched. Returns None when
+    the text has another defect, or more trailing commas than
+    TRAILING_COMMA_RETRIES, and needs the full repair pass.
+    """
+    text = raw
+    for _ in range(TRAILING_COMMA_RETRIES + 1):
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError as e:
+            comma = _trailing_comma_at(text, e.pos)
+            if comma == -1:
+                return None
+            text = text[:comma] + text[comma + 1:]
+    return None
+
+
+def extract_json(raw: str, allow_partial: bool = False):
+    """Extract, repair and parse the outermost JSON object in LLM output."""
+    start = raw.find("{")
+    if start == -1:
+        raise JSONExtractionError("no JSON object found")
+
+    # Fast path: well-formed answers (and ones whose only defect is a few
+    # trailing commas) decode straight from the first "{"; surrounding
+    # chatter and code fences are simply never looked at
+    parsed = _decode_dropping_trailing_commas(raw, start)
+    if parsed is not None:
+        return parsed
+
+    repaired = repair_json_text(raw, allow_partial=allow_partial)
+    try:
+        return _decoder.decode(repaired)
+    except json.JSONDecodeError as e:
+        raise JSONExtractionError(e.msg, e.pos, _snippet(repaired, e.pos))
@@ -0,0 +1,70 @@
+from utils.json_extract import extract_json, JSONExtractionError
+
+
+class IncrementalArrayParser:
+    """
+    Incrementally scans streamed LLM text and returns each object that is a
+    direct element of the first JSON array as soon as its closing brace arrives.
+
+    Works for both {"questions": [{...}, {...}]} and a bare [{...}, {...}].
+    Only the text of the object currently being captured is kept in memory.
+    """
+
+    def __init__(self):
+        self.stack = []          # open containers: "{" or "["
+        self.in_string = False
+        self.escape = False
+        self.capture = None      # list of chars for the element being captured
+        self.capture_depth = 0   # stack size right after the element's "{"
+        self.array_depth = None  # stack size of the first array we saw
+
+    def feed(self, text: str):
+        """Consume a chunk of text and return the list of completed element objects."""
+        completed = []
+
+        for ch in text:
+            if self.capture is not None:
+                self.capture.append(ch)
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+
+            if ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.stack.append(ch)
+                if ch == "[" and self.array_depth is None:
+                    self.array_depth = len(self.stack)
+                elif (
+                    ch == "{"
+                    and self.capture is None
+                    and len(self.stack) - 1 == self.array_depth
+                    and self.stack[-2] == "["
+                ):
+                    self.capture = ["{"]
+                    self.capture_depth = len(self.stack)
+            elif ch in "}]":
+                if not self.stack:
+                    continue
+                self.stack.pop()
+                if self.capture is not None and len(self.stack) == self.capture_depth - 1:
+                    obj = self._load("".join(self.capture))
+                    if obj is not None:
+                        completed.append(obj)
+                    self.capture = None
+
+        return completed
+
+    @staticmethod
+    def _load(raw: str):
+        try:
+            return extract_json(raw)
+        except JSONExtractionError as e:
+            print(f"Streamed JSON Parse Error: {e}")
+            return None
@@ -0,0 +1,122 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.plan_progress import PlanProgress
+from utils.day_set import DaySet
+
+
+def parse_days(completed_day_numbers: str | None):
+    """Day numbers from the legacy "1,3,5" column format."""
+    if not completed_day_numbers:
+        return []
+    return sorted({int(day) for day in completed_day_numbers.split(",") if day.strip().isdigit()})
+
+
+def row_days(completed_days_mask: bytes | None, completed_day_numbers: str | None = None):
+    """The row's completed days; rows written before the mask column fall back to the legacy list."""
+    if completed_days_mask is None:
+        return DaySet.from_days(parse_days(completed_day_numbers))
+    return DaySet.from_bytes(completed_days_mask)
+
+
+UPSERT_ATTEMPTS = 20
+
+
+def _values(days: DaySet, total_days: int):
+    return {
+        "total_days": total_days,
+        "completed_days_mask": days.to_bytes(),
+        "completed_day_numbers": "",
+        "completed_days": len(days),
+        "is_completed": bool(total_days) and len(days) >= total_days,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _upsert(db: Session, user_id: int, plan_id: int, update, total_days: int | None = None):
+    """
+    Apply update(days) -> days to the (user_id, plan_id) row, creating it if
+    needed. The write is a compare-and-set on the previous mask, so a
+    concurrent change to the same row makes this one re-read and retry
+    instead of overwriting it; a concurrent insert is retried as an update.
+    """
+    for _ in range(UPSERT_ATTEMPTS):
+        row = db.query(
+            PlanProgress.id,
+            PlanProgress.completed_days_mask,
+            PlanProgress.completed_day_numbers,
+            PlanProgress.total_days,
+        ).filter(
+            PlanProgress.user_id == user_id,
+            PlanProgress.plan_id == plan_id,
+        ).first()
+        try:
+            if row is None:
+                days = update(DaySet())
+                db.add(PlanProgress(user_id=user_id, plan_id=plan_id, **_values(days, total_days or 0)))
+                db.commit()
+                return days
+
+            days = update(row_days(row.completed_days_mask, row.completed_day_numbers))
+            values = _values(days, row.total_days if total_days is None else total_days)
+            changed = db.query(PlanProgress).filter(
+                PlanProgress.id == row.id,
+                PlanProgress.completed_days_mask == row.completed_days_mask,
+            ).update(values, synchronize_session=False)
+            db.commit()
+            if changed:
+                return days
+        except IntegrityError:
+            # Another request created the row first; update it instead
+            db.rollback()
+    raise RuntimeError(f"Could not update progress for plan {plan_id}: too many concurrent writes")
+
+
+def get_completed_days(db: Session, user_id: int, plan_id: int):
+    row = db.query(PlanProgress.completed_days_mask, PlanProgress.completed_day_numbers).filter(
+        PlanProgress.user_id == user_id,
+        PlanProgress.plan_id == plan_id,
+    ).first()
+    return row_days(*row) if row else DaySet()
+
+
+def get_completed_days_by_plan(db: Session, user_id: int, plan_ids: list | None = None):
+    """plan_id -> DaySet for the user's plans (all of them, or just plan_ids), in one indexed query."""
+    query = db.query(
+        PlanProgress.plan_id, PlanProgress.completed_days_mask, PlanProgress.completed_day_numbers
+    ).filter(PlanProgress.user_id == user_id)
+    if plan_ids is not None:
+        query = query.filter(PlanProgress.plan_id.in_(plan_ids))
+    return {plan_id: row_days(mask, numbers) for plan_id, mask, numbers in query}
+
+
+def init_plan_progress(db: Session, user_id: int, plan_id: int, total_days: int):
+    return _upsert(db, user_id, plan_id, lambda days: DaySet(), total_days)
+
+
+def _with_day(day_number: int):
+    def update(days: DaySet):
+        days.add(day_number)
+        return days
+    return update
+
+
+def complete_day(db: Session, user_id: int, plan_id: int, day_number: int, total_days: int | None = None):
+    return _upsert(db, user_id, plan_id, _with_day(day_number), total_days)
+
+
+def reset_progress(db: Session, user_id: int, plan_id: int | None = None):
+    """Clear completed days for one plan, or for all of the user's plans."""
+    query = db.query(PlanProgress).filter(PlanProgress.user_id == user_id)
+    if plan_id:
+        query = query.filter(PlanProgress.plan_id == plan_id)
+    query.update(
+        {"completed_days_mask": b"", "completed_day_numbers": "", "completed_days": 0, "is_completed": False},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def delete_plan_progress(db: Session, plan_id: int):
+    db.query(PlanProgress).filter(PlanProgress.plan_id == plan_id).delete(synchronize_session=False)
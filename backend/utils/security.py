@@ -56,6 +56,19 @@ def create_reset_token(email: str) -> str:
     to_encode = {"exp": expire, "sub": email, "type": "reset"}
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def user_id_from_token(token: str) -> int | None:
+    """User id from a valid access token, or None; used where a DB lookup is not needed."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.JWTError:
+        return None
+    if payload.get("type") == "reset":
+        return None
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
 def verify_reset_token(token: str) -> str | None:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,36 @@
+import json
+
+from ai.gemini import LLMBusyError
+from ai.resilience import LLMUnavailableError
+
+
+def format_sse(data: str, event: str | None = None) -> str:
+    """Format one Server-Sent Event; multi-line data becomes multiple data: lines."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    for line in data.split("\n"):
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def single_chunk(text: str):
+    """Stream an already known answer through the same path as a live one."""
+    yield text
+
+
+async def stream_sse(chunks):
+    """Wrap an async iterator of text chunks as an SSE stream ending with a done event."""
+    try:
+        async for chunk in chunks:
+            yield format_sse(chunk)
+    except (LLMBusyError, LLMUnavailableError) as e:
+        # Headers are already sent, so report the error in-band
+        yield format_sse(json.dumps({"detail": str(e)}), event="error")
+        return
+    except Exception as e:
+        print(f"Streaming Error: {e}")
+        yield format_sse(json.dumps({"detail": "AI generation failed"}), event="error")
+        return
+
+    yield format_sse("", event="done")
@@ -0,0 +1,6 @@
+import re
+
+
+def canonical_topic(text: str) -> str:
+    # "Photosynthesis ", "photosynthesis!" and "PHOTOSYNTHESIS" share one key
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
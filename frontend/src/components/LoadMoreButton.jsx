@@ -0,0 +1,16 @@
+import React from "react";
+
+// Shown under a paginated list while the API has another page (next_cursor)
+function LoadMoreButton({ cursor, loading, onClick }) {
+  if (!cursor) return null;
+
+  return (
+    <div style={{ textAlign: "center", marginTop: "1rem" }}>
+      <button className="secondary-btn" onClick={onClick} disabled={loading}>
+        {loading ? "Loading..." : "Load more"}
+      </button>
+    </div>
+  );
+}
+
+export default LoadMoreButton;
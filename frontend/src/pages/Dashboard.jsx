@@ -1,8 +1,16 @@
 import React, { useEffect, useState } from "react";
-import api from "../utils/api";
+import api, { getPage } from "../utils/api";
+import LoadMoreButton from "../components/LoadMoreButton";
+
+const EMPTY_SUMMARY = {
+  total_plans: 0, active_plans: 0, completed_plans: 0, active_total_days: 0, active_completed_days: 0
+};
 
 function Dashboard({ setTab }) {
   const [plans, setPlans] = useState([]);
+  const [summary, setSummary] = useState(EMPTY_SUMMARY);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
 
@@ -12,11 +20,16 @@ function Dashboard({ setTab }) {
       if (showLoading) setLoading(true);
       setRefreshing(true);
       
-      // Fetch user's plans (which now include individual progress)
-      const plansRes = await api.get("/study/plans");
-      setPlans(plansRes.data);
+      // Totals over every plan, and the newest page of plans (which now include individual progress)
+      const [summaryRes, plansRes] = await Promise.all([
+        api.get("/progress/summary"),
+        getPage("/study/plans")
+      ]);
+      setSummary(summaryRes.data);
+      setPlans(plansRes.items);
+      setCursor(plansRes.next_cursor);
       
-      console.log("✅ Dashboard data refreshed:", plansRes.data);
+      console.log("✅ Dashboard data refreshed:", plansRes);
       
     } catch (err) {
       console.error("Failed to fetch dashboard data", err);
@@ -39,10 +52,15 @@ function Dashboard({ setTab }) {
       const timestamp = Date.now();
       
       // Fetch user's plans with cache-busting
-      const plansRes = await api.get(`/study/plans?t=${timestamp}`);
-      setPlans(plansRes.data);
+      const [summaryRes, plansRes] = await Promise.all([
+        api.get(`/progress/summary?t=${timestamp}`),
+        getPage(`/study/plans?t=${timestamp}`)
+      ]);
+      setSummary(summaryRes.data);
+      setPlans(plansRes.items);
+      setCursor(plansRes.next_cursor);
       
-      console.log("✅ Dashboard manually refreshed:", plansRes.data);
+      console.log("✅ Dashboard manually refreshed:", plansRes);
       
     } catch (err) {
       console.error("Failed to refresh dashboard data", err);
@@ -51,6 +69,18 @@ function Dashboard({ setTab }) {
     }
   };
 
+  const loadMorePlans = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getPage("/study/plans", cursor);
+      setPlans((prev) => [...prev, ...page.items]);
+      setCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Failed to load more plans", err);
+    }
+    setLoadingMore(false);
+  };
+
   if (loading) {
     return (
       <div className="page-container">
@@ -62,24 +92,12 @@ function Dashboard({ setTab }) {
     );
   }
 
-  // 🔹 Calculate overall stats from ACTIVE plans only (exclude completed plans)
-  const activePlans = plans.filter(plan => {
-    const planPercent = plan.total_days > 0 ? (plan.completed_days / plan.total_days) * 100 : 0;
-    return planPercent < 100; // Only count plans that are not 100% complete
-  });
-  
-  const completedPlans = plans.filter(plan => {
-    const planPercent = plan.total_days > 0 ? (plan.completed_days / plan.total_days) * 100 : 0;
-    return planPercent >= 100; // Count completed plans separately
-  });
-  
-  const totalPlans = plans.length;
-  const activePlansCount = activePlans.length;
-  const completedPlansCount = completedPlans.length;
-  
-  // Calculate overall progress from ACTIVE plans only
-  const totalDaysAcrossActivePlans = activePlans.reduce((sum, plan) => sum + (plan.total_days || 0), 0);
-  const totalCompletedDaysAcrossActivePlans = activePlans.reduce((sum, plan) => sum + (plan.completed_days || 0), 0);
+  // 🔹 Overall stats come from ACTIVE plans only (completed plans are counted separately), across every plan
+  const totalPlans = summary.total_plans;
+  const activePlansCount = summary.active_plans;
+  const completedPlansCount = summary.completed_plans;
+  const totalDaysAcrossActivePlans = summary.active_total_days;
+  const totalCompletedDaysAcrossActivePlans = summary.active_completed_days;
   
   // Overall progress is 0 if no active plans, otherwise calculate from active plans only
   const overallPercent = totalDaysAcrossActivePlans > 0 
@@ -211,6 +229,7 @@ function Dashboard({ setTab }) {
                 </div>
               );
             })}
+            <LoadMoreButton cursor={cursor} loading={loadingMore} onClick={loadMorePlans} />
           </div>
         )}
       </div>
@@ -253,14 +272,14 @@ function Dashboard({ setTab }) {
               </div>
             ))}
             
-            {plans.length > 3 && (
+            {totalPlans > 3 && (
               <div className="view-all-plans">
                 <button 
                   className="secondary-btn"
                   onClick={() => setTab && setTab("myplans")}
                 >
                   <span>📋</span>
-                  View All Plans ({plans.length})
+                  View All Plans ({totalPlans})
                 </button>
               </div>
             )}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
-import api from "../utils/api";
+import api, { getPage } from "../utils/api";
 import PlanCard from "../components/PlanCard";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 function MyPlans({ setTab }) {
   const [plans, setPlans] = useState([]);
@@ -9,6 +10,8 @@ function MyPlans({ setTab }) {
   const [error, setError] = useState("");
   const [refreshKey, setRefreshKey] = useState(0);
   const [completedDays, setCompletedDays] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchPlans();
@@ -33,8 +36,9 @@ function MyPlans({ setTab }) {
   const fetchPlans = async () => {
     try {
       setLoading(true);
-      const res = await api.get("/study/plans");
-      setPlans(res.data);
+      const page = await getPage("/study/plans");
+      setPlans(page.items);
+      setCursor(page.next_cursor);
       
       // If a plan is selected, refresh its details
       if (selectedPlan) {
@@ -48,6 +52,19 @@ function MyPlans({ setTab }) {
     }
   };
 
+  const loadMorePlans = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getPage("/study/plans", cursor);
+      setPlans(prev => [...prev, ...page.items]);
+      setCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Failed to load more plans:", err);
+      setError("Failed to load your study plans");
+    }
+    setLoadingMore(false);
+  };
+
   const viewPlanDetails = async (planId) => {
     try {
       const res = await api.get(`/study/plans/${planId}`);
@@ -145,7 +162,7 @@ function MyPlans({ setTab }) {
           {/* Plans List */}
           <div className="plans-sidebar">
             <div className="plans-header">
-              <h3>Your Plans ({plans.length})</h3>
+              <h3>Your Plans ({plans.length}{cursor ? "+" : ""})</h3>
               <button 
                 className="secondary-btn"
                 onClick={() => setTab("planner")}
@@ -344,6 +361,7 @@ function MyPlans({ setTab }) {
                   </>
                 );
               })()}
+              <LoadMoreButton cursor={cursor} loading={loadingMore} onClick={loadMorePlans} />
             </div>
           </div>
 
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
-import api from "../utils/api";
+import api, { getPage } from "../utils/api";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 function Notes() {
   const [title, setTitle] = useState("");
@@ -8,16 +9,31 @@ function Notes() {
   const [notes, setNotes] = useState([]);
   const [editingNote, setEditingNote] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchNotes = async () => {
     try {
-      const res = await api.get("/saved/notes");
-      setNotes(res.data);
+      const page = await getPage("/saved/notes");
+      setNotes(page.items);
+      setCursor(page.next_cursor);
     } catch (err) {
       console.error("Failed to fetch notes:", err);
     }
   };
 
+  const loadMoreNotes = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getPage("/saved/notes", cursor);
+      setNotes((prev) => [...prev, ...page.items]);
+      setCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Failed to load more notes:", err);
+    }
+    setLoadingMore(false);
+  };
+
   const addNote = async () => {
     if (!title.trim() || !content.trim()) {
       alert("Please enter both title and content");
@@ -48,17 +64,18 @@ function Notes() {
 
     setLoading(true);
     try {
-      await api.put(`/saved/notes/${editingNote.id}`, {
+      const res = await api.put(`/saved/notes/${editingNote.id}`, {
         title: title.trim(),
         content: content.trim(),
         category: category
       });
 
+      // Notes are listed by creation time, so the edited note stays where it is
+      setNotes((prev) => prev.map((note) => (note.id === res.data.id ? res.data : note)));
       setEditingNote(null);
       setTitle("");
       setContent("");
       setCategory("General");
-      fetchNotes();
     } catch (err) {
       console.error("Failed to update note:", err);
       alert("❌ Failed to update note");
@@ -71,7 +88,7 @@ function Notes() {
 
     try {
       await api.delete(`/saved/notes/${noteId}`);
-      fetchNotes();
+      setNotes((prev) => prev.filter((note) => note.id !== noteId));
     } catch (err) {
       console.error("Failed to delete note:", err);
       alert("❌ Failed to delete note");
@@ -268,6 +285,7 @@ function Notes() {
               </div>
             </div>
           ))}
+          <LoadMoreButton cursor={cursor} loading={loadingMore} onClick={loadMoreNotes} />
         </div>
       )}
     </div>
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
-import api from "../utils/api";
+import api, { getPage } from "../utils/api";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 function SavedContent() {
   const [activeTab, setActiveTab] = useState("quizzes");
@@ -8,32 +9,54 @@ function SavedContent() {
   const [explanations, setExplanations] = useState([]);
   const [loading, setLoading] = useState(false);
   const [expandedQuiz, setExpandedQuiz] = useState(null);
+  // next_cursor per list; null once its last page is loaded
+  const [cursors, setCursors] = useState({ quizzes: null, resources: null, explanations: null });
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const setters = { quizzes: setQuizzes, resources: setResources, explanations: setExplanations };
 
   const fetchSavedContent = async () => {
     setLoading(true);
     try {
       const [quizzesRes, resourcesRes, explanationsRes] = await Promise.all([
-        api.get("/saved/quizzes"),
-        api.get("/saved/resources"),
-        api.get("/saved/explanations")
+        getPage("/saved/quizzes"),
+        getPage("/saved/resources"),
+        getPage("/saved/explanations")
       ]);
       
-      console.log("Fetched quizzes:", quizzesRes.data); // Debug log
-      setQuizzes(quizzesRes.data);
-      setResources(resourcesRes.data);
-      setExplanations(explanationsRes.data);
+      console.log("Fetched quizzes:", quizzesRes.items); // Debug log
+      setQuizzes(quizzesRes.items);
+      setResources(resourcesRes.items);
+      setExplanations(explanationsRes.items);
+      setCursors({
+        quizzes: quizzesRes.next_cursor,
+        resources: resourcesRes.next_cursor,
+        explanations: explanationsRes.next_cursor
+      });
     } catch (err) {
       console.error("Failed to fetch saved content:", err);
     }
     setLoading(false);
   };
 
+  const loadMore = async (list) => {
+    setLoadingMore(true);
+    try {
+      const page = await getPage(`/saved/${list}`, cursors[list]);
+      setters[list]((prev) => [...prev, ...page.items]);
+      setCursors((prev) => ({ ...prev, [list]: page.next_cursor }));
+    } catch (err) {
+      console.error(`Failed to load more ${list}:`, err);
+    }
+    setLoadingMore(false);
+  };
+
   const deleteQuiz = async (quizId) => {
     if (!window.confirm("Are you sure you want to delete this quiz?")) return;
     
     try {
       await api.delete(`/saved/quizzes/${quizId}`);
-      fetchSavedContent();
+      setQuizzes((prev) => prev.filter((item) => item.id !== quizId));
     } catch (err) {
       console.error("Failed to delete quiz:", err);
     }
@@ -44,7 +67,7 @@ function SavedContent() {
     
     try {
       await api.delete(`/saved/resources/${resourceId}`);
-      fetchSavedContent();
+      setResources((prev) => prev.filter((item) => item.id !== resourceId));
     } catch (err) {
       console.error("Failed to delete resource:", err);
     }
@@ -55,7 +78,7 @@ function SavedContent() {
     
     try {
       await api.delete(`/saved/explanations/${explanationId}`);
-      fetchSavedContent();
+      setExplanations((prev) => prev.filter((item) => item.id !== explanationId));
     } catch (err) {
       console.error("Failed to delete explanation:", err);
     }
@@ -96,19 +119,19 @@ function SavedContent() {
             className={activeTab === "quizzes" ? "tab-btn active" : "tab-btn"}
             onClick={() => setActiveTab("quizzes")}
           >
-            🧠 Quizzes ({quizzes.length})
+            🧠 Quizzes ({quizzes.length}{cursors.quizzes ? "+" : ""})
           </button>
           <button
             className={activeTab === "resources" ? "tab-btn active" : "tab-btn"}
             onClick={() => setActiveTab("resources")}
           >
-            📚 Resources ({resources.length})
+            📚 Resources ({resources.length}{cursors.resources ? "+" : ""})
           </button>
           <button
             className={activeTab === "explanations" ? "tab-btn active" : "tab-btn"}
             onClick={() => setActiveTab("explanations")}
           >
-            🤖 Explanations ({explanations.length})
+            🤖 Explanations ({explanations.length}{cursors.explanations ? "+" : ""})
           </button>
         </div>
 
@@ -277,6 +300,7 @@ function SavedContent() {
                     </div>
                   </div>
                 ))}
+                <LoadMoreButton cursor={cursors.quizzes} loading={loadingMore} onClick={() => loadMore("quizzes")} />
               </div>
             )}
           </div>
@@ -339,6 +363,7 @@ function SavedContent() {
                     </div>
                   </div>
                 ))}
+                <LoadMoreButton cursor={cursors.resources} loading={loadingMore} onClick={() => loadMore("resources")} />
               </div>
             )}
           </div>
@@ -409,6 +434,7 @@ function SavedContent() {
                     </div>
                   </div>
                 ))}
+                <LoadMoreButton cursor={cursors.explanations} loading={loadingMore} onClick={() => loadMore("explanations")} />
               </div>
             )}
           </div>
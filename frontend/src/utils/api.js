@@ -50,5 +50,11 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are paginated ({ items, next_cursor }); fetch one page, newest first
+const getPage = async (path, cursor = null, limit = 20) => {
+  const res = await api.get(path, { params: { limit, ...(cursor ? { cursor } : {}) } });
+  return res.data;
+};
+
 export default api;
-export { API_BASE_URL };
+export { API_BASE_URL, getPage };